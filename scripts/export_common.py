@@ -0,0 +1,62 @@
+"""
+Rounding and CSV output settings shared by the export scripts.
+
+export_normalized.py and forecast.py both round to 4 significant figures
+and write their tables in bounded chunks.
+"""
+
+import numpy as np
+
+CSV_CHUNK_ROWS = 10_000  # Rows formatted per to_csv write
+SPLITTER = 2.0**27 + 1  # Veltkamp splitting constant for float64
+
+
+def product_error(a: np.ndarray, b: np.ndarray, p: np.ndarray) -> np.ndarray:
+    """Exact rounding error of p = a * b, so that a * b == p + error (Dekker)."""
+    # Split each factor into two 26-bit halves whose products are exact
+    t = SPLITTER * a
+    a_hi = t - (t - a)
+    a_lo = a - a_hi
+    t = SPLITTER * b
+    b_hi = t - (t - b)
+    b_lo = b - b_hi
+    return ((a_hi * b_hi - p) + a_hi * b_lo + a_lo * b_hi) + a_lo * b_lo
+
+
+def round_sig_figs(values: np.ndarray, digits: int = 4) -> np.ndarray:
+    """Round values to significant figures (vectorized f"{x:.4g}")."""
+    out = np.array(values, dtype=np.float64)
+    mask = np.isfinite(out) & (out != 0)
+    x = out[mask]
+    exponent = digits - 1 - np.floor(np.log10(np.abs(x)))
+    # Scale by exact powers of ten in both directions to avoid 1e-3 style error
+    up = exponent >= 0
+    down = ~up
+    scale = np.power(10.0, np.abs(exponent, out=exponent), out=exponent)
+    # Masked in-place ufuncs: each element only takes its own branch
+    scaled = np.empty_like(x)
+    np.multiply(x, scale, out=scaled, where=up)
+    np.divide(x, scale, out=scaled, where=down)
+    rounded = np.round(scaled)
+    # Scaling itself rounds, and can land exactly on a .5 tie the true value
+    # is not on (127.94999999999999 * 10 == 1279.5). Settle those by the sign
+    # of the scaling error; only genuine ties are left to round half to even.
+    tie = np.abs(scaled - np.trunc(scaled)) == 0.5
+    if tie.any():
+        x_t, scale_t, scaled_t = x[tie], scale[tie], scaled[tie]
+        # How far the true value x * scale (or x / scale) lies above scaled
+        above = np.where(
+            up[tie],
+            product_error(x_t, scale_t, scaled_t),
+            (x_t - scaled_t * scale_t)
+            - product_error(scaled_t, scale_t, scaled_t * scale_t),
+        )
+        rounded[tie] = np.where(
+            above > 0,
+            np.ceil(scaled_t),
+            np.where(above < 0, np.floor(scaled_t), rounded[tie]),
+        )
+    np.divide(rounded, scale, out=rounded, where=up)
+    np.multiply(rounded, scale, out=rounded, where=down)
+    out[mask] = rounded
+    return out
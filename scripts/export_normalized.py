@@ -10,8 +10,60 @@ All tables are joined on 'month' as the primary key.
 Columns are expanded based on master CSV patterns.
 """
 
+import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from pandas.api.types import is_numeric_dtype
+
+from export_common import CSV_CHUNK_ROWS, round_sig_figs
+
+MONTH_FORMAT = "%Y-%m"
+
+
+def read_csv(
+    path: Path, dtype: dict[str, object], index_col: str | None = None
+) -> pd.DataFrame:
+    """Read a CSV with the multithreaded PyArrow parser and explicit dtypes.
+
+    'month' is parsed to datetimes once here, so every join and sort
+    downstream works on int64 keys instead of strings.
+    """
+    df = pd.read_csv(path, engine="pyarrow", dtype=dtype, index_col=index_col)
+    if index_col == "month":
+        df.index = pd.to_datetime(df.index, format=MONTH_FORMAT)
+    else:
+        df["month"] = pd.to_datetime(df["month"], format=MONTH_FORMAT)
+    return df
+
+
+def read_names(path: Path, id_col: str) -> pd.Series:
+    """Read a master CSV as an ID -> name mapping, parsing only those columns."""
+    return pd.read_csv(
+        path,
+        engine="pyarrow",
+        usecols=[id_col, "name"],
+        dtype={id_col: str, "name": str},
+        index_col=id_col,
+    )["name"]
+
+
+def pivot_by_id(
+    values: pd.Series, id_col: str, names: pd.Series, prefix: str
+) -> pd.DataFrame:
+    """Sum values per month and ID, with a named column for every master ID.
+
+    `values` is indexed by (month, id_col, ...); grouping on its index levels
+    reuses their integer codes instead of re-hashing the string columns.
+    `names` maps master IDs to display names (IDs missing from it are kept).
+    The result is indexed by month so it can be joined without re-indexing.
+    """
+    # Relabel the level's unique IDs, so pivoted columns come out named
+    values = values.rename(index=names, level=id_col)
+    pivoted = values.groupby(level=["month", id_col]).sum().unstack(fill_value=0)
+    # Ensure all master IDs exist
+    pivoted = pivoted.reindex(columns=pivoted.columns.union(names), fill_value=0)
+    return pivoted.add_prefix(prefix)
 
 
 def main() -> None:
@@ -23,101 +75,92 @@ def main() -> None:
     master_dir = base_dir / "master"
     output_path = calculated_dir / "normalized.csv"
 
-    # Load master files
-    accounts = pd.read_csv(master_dir / "accounts.csv")
-    asset_classes = pd.read_csv(master_dir / "asset_classes.csv")
-    payment_methods = pd.read_csv(master_dir / "payment_methods.csv")
-
-    # Create ID to name mappings
-    account_names = dict(zip(accounts["account_id"], accounts["name"]))
-    class_names = dict(zip(asset_classes["class_id"], asset_classes["name"]))
-    method_names = dict(zip(payment_methods["method_id"], payment_methods["name"]))
+    # Load master files as ID to name mappings
+    account_names = read_names(master_dir / "accounts.csv", "account_id")
+    class_names = read_names(master_dir / "asset_classes.csv", "class_id")
+    method_names = read_names(master_dir / "payment_methods.csv", "method_id")
 
     # Load input CSVs
-    assets = pd.read_csv(input_dir / "assets.csv")
-    income = pd.read_csv(input_dir / "income.csv")
-    expense = pd.read_csv(input_dir / "expense.csv")
-
-    # Pivot assets by account_id (balance per account)
-    assets_by_account = assets.pivot_table(
-        index="month",
-        columns="account_id",
-        values="balance",
-        aggfunc="sum",
-        fill_value=0,
-    ).reset_index()
-    # Ensure all accounts exist
-    for acc_id in accounts["account_id"]:
-        if acc_id not in assets_by_account.columns:
-            assets_by_account[acc_id] = 0
-    assets_by_account.columns = ["month"] + [
-        f"資産_{account_names.get(col, col)}" for col in assets_by_account.columns[1:]
-    ]
-
-    # Pivot assets by asset_class (balance per asset class)
-    assets_by_class = assets.pivot_table(
-        index="month",
-        columns="asset_class",
-        values="balance",
-        aggfunc="sum",
-        fill_value=0,
-    ).reset_index()
-    # Ensure all asset classes exist
-    for class_id in asset_classes["class_id"]:
-        if class_id not in assets_by_class.columns:
-            assets_by_class[class_id] = 0
-    assets_by_class.columns = ["month"] + [
-        f"分類_{class_names.get(col, col)}" for col in assets_by_class.columns[1:]
-    ]
-
-    # Pivot income by account_id
-    income_by_account = income.pivot_table(
-        index="month",
-        columns="account_id",
-        values="amount",
-        aggfunc="sum",
-        fill_value=0,
-    ).reset_index()
-    # Ensure all accounts exist (for income)
-    for acc_id in accounts["account_id"]:
-        if acc_id not in income_by_account.columns:
-            income_by_account[acc_id] = 0
-    income_by_account.columns = ["month"] + [
-        f"収入_{account_names.get(col, col)}" for col in income_by_account.columns[1:]
-    ]
-
-    # Pivot expense by method_id
-    expense_by_method = expense.pivot_table(
-        index="month",
-        columns="method_id",
-        values="amount",
-        aggfunc="sum",
-        fill_value=0,
-    ).reset_index()
-    # Ensure all payment methods exist
-    for method_id in payment_methods["method_id"]:
-        if method_id not in expense_by_method.columns:
-            expense_by_method[method_id] = 0
-    expense_by_method.columns = ["month"] + [
-        f"支出_{method_names.get(col, col)}" for col in expense_by_method.columns[1:]
-    ]
+    assets = read_csv(
+        input_dir / "assets.csv",
+        {"month": str, "account_id": str, "asset_class": str, "balance": "float64"},
+    )
+    income = read_csv(
+        input_dir / "income.csv",
+        {"month": str, "account_id": str, "amount": "int64"},
+    )
+    expense = read_csv(
+        input_dir / "expense.csv",
+        {"month": str, "method_id": str, "amount": "int64"},
+    )
+
+    # Aggregate assets in a single pass; both asset pivots roll up from it
+    asset_balances = assets.groupby(["month", "account_id", "asset_class"])[
+        "balance"
+    ].sum()
+
+    # The four pivots are independent, and pandas releases the GIL inside its
+    # groupby kernels, so run them concurrently
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        # Pivot assets by account_id (balance per account)
+        account_future = executor.submit(
+            pivot_by_id, asset_balances, "account_id", account_names, "資産_"
+        )
+        # Pivot assets by asset_class (balance per asset class)
+        class_future = executor.submit(
+            pivot_by_id, asset_balances, "asset_class", class_names, "分類_"
+        )
+        # Pivot income by account_id
+        income_future = executor.submit(
+            pivot_by_id,
+            income.set_index(["month", "account_id"])["amount"],
+            "account_id",
+            account_names,
+            "収入_",
+        )
+        # Pivot expense by method_id
+        expense_future = executor.submit(
+            pivot_by_id,
+            expense.set_index(["month", "method_id"])["amount"],
+            "method_id",
+            method_names,
+            "支出_",
+        )
+        assets_by_account = account_future.result()
+        assets_by_class = class_future.result()
+        income_by_account = income_future.result()
+        expense_by_method = expense_future.result()
 
     # Load all calculated CSVs
-    balance_sheet = pd.read_csv(calculated_dir / "balance_sheet.csv")
-    cashflow = pd.read_csv(calculated_dir / "cashflow.csv")
-    metrics = pd.read_csv(calculated_dir / "metrics.csv")
+    balance_sheet = read_csv(
+        calculated_dir / "balance_sheet.csv", {"month": str}, index_col="month"
+    )
+    cashflow = read_csv(
+        calculated_dir / "cashflow.csv", {"month": str}, index_col="month"
+    )
+    metrics = read_csv(
+        calculated_dir / "metrics.csv", {"month": str}, index_col="month"
+    )
 
     # Join all tables on 'month' column
     # Order: P/L (income → expense) → B/S (class → account) → calculated metrics
-    normalized = income_by_account.merge(expense_by_method, on="month", how="outer")
-    normalized = normalized.merge(cashflow, on="month", how="outer")
-    normalized = normalized.merge(assets_by_class, on="month", how="outer")
-    normalized = normalized.merge(assets_by_account, on="month", how="outer")
-    normalized = normalized.merge(balance_sheet, on="month", how="outer")
-    normalized = normalized.merge(metrics, on="month", how="outer")
+    # Every frame is unique per month, so one index-aligned concat replaces
+    # a chain of outer merges (sorted once at the end).
+    frames = [
+        income_by_account,
+        expense_by_method,
+        cashflow,
+        assets_by_class,
+        assets_by_account,
+        balance_sheet,
+        metrics,
+    ]
+    normalized = pd.concat(frames, axis=1, join="outer", sort=False)
 
     # Sort by month
-    normalized = normalized.sort_values("month").reset_index(drop=True)
+    normalized = normalized.sort_index()
+    normalized.index = normalized.index.strftime(MONTH_FORMAT).rename("month")
+    normalized = normalized.reset_index()
 
     # Define column order based on finance logic
     # 1. month (primary key)
@@ -125,11 +168,22 @@ def main() -> None:
     # 3. B/S: 分類 (asset class) → 資産 (by account) → balance sheet totals
     # 4. Metrics: ratios and returns
     col_order = ["month"]
-    income_cols = sorted([c for c in normalized.columns if c.startswith("収入_")])
-    expense_cols = sorted([c for c in normalized.columns if c.startswith("支出_")])
+    # Bucket prefixed columns in a single pass over the columns
+    buckets: dict[str, list[str]] = {
+        p: [] for p in ("収入_", "支出_", "分類_", "資産_")
+    }
+    for c in normalized.columns:
+        for prefix, cols in buckets.items():
+            if c.startswith(prefix):
+                cols.append(c)
+                break
+    for cols in buckets.values():
+        cols.sort()
+    income_cols = buckets["収入_"]
+    expense_cols = buckets["支出_"]
     cashflow_cols = ["after_tax_income", "expenditure", "net_savings"]
-    class_cols = sorted([c for c in normalized.columns if c.startswith("分類_")])
-    asset_cols = sorted([c for c in normalized.columns if c.startswith("資産_")])
+    class_cols = buckets["分類_"]
+    asset_cols = buckets["資産_"]
     bs_cols = ["liquid_assets", "risk_assets", "pension_assets", "total_financial_assets", "investment_gain_loss"]
     metric_cols = ["savings_rate", "risk_asset_ratio", "monthly_return", "monthly_alpha", 
                    "benchmark_return", "fi_ratio_12m", "fi_ratio_48m", "fi_ratio_next_12m"]
@@ -142,21 +196,24 @@ def main() -> None:
     all_ordered += [c for c in bs_cols if c in normalized.columns]
     all_ordered += [c for c in metric_cols if c in normalized.columns]
     
+    # Every column placed so far (except month) is numeric by construction
+    numeric_cols = all_ordered[1:]
+
     # Add any remaining columns not in the order
-    remaining = [c for c in normalized.columns if c not in all_ordered]
+    ordered = set(all_ordered)
+    remaining = [c for c in normalized.columns if c not in ordered]
     all_ordered += remaining
+    numeric_cols += [c for c in remaining if is_numeric_dtype(normalized[c])]
     
-    normalized = normalized[all_ordered]
+    normalized = normalized.reindex(columns=pd.Index(all_ordered))
 
     # Round numeric columns to 4 significant figures
-    numeric_cols = normalized.select_dtypes(include=["float64", "int64"]).columns
-    for col in numeric_cols:
-        normalized[col] = normalized[col].apply(
-            lambda x: float(f"{x:.4g}") if pd.notna(x) else x
-        )
+    normalized[numeric_cols] = round_sig_figs(
+        normalized[numeric_cols].to_numpy(dtype=np.float64)
+    )
 
-    # Export to CSV
-    normalized.to_csv(output_path, index=False)
+    # Export to CSV in bounded chunks to cap peak memory
+    normalized.to_csv(output_path, index=False, chunksize=CSV_CHUNK_ROWS)
     print(f"Exported normalized table to: {output_path}")
     print(f"Rows: {len(normalized)}, Columns: {len(normalized.columns)}")
     print(f"\nColumn order (finance logic):")
@@ -2,40 +2,32 @@
 Multiple VC entries per month should be named vc_1, vc_2, vc_3 (sorted by value).
 """
 
+import numpy as np
 import pandas as pd
 
 df = pd.read_csv("data/input/assets.csv")
 
-result_rows = []
-processed_months = set()
-
-for idx, row in df.iterrows():
-    if row["account_id"] == "sbi_sec" and row["asset_class"] == "vc":
-        month = row["month"]
-        if month in processed_months:
-            continue
-        processed_months.add(month)
-
-        month_vcs = df[
-            (df["month"] == month)
-            & (df["account_id"] == "sbi_sec")
-            & (df["asset_class"] == "vc")
-        ]
-
-        if len(month_vcs) == 1:
-            result_rows.append(row.to_dict())
-        else:
-            # Sort by balance, name vc_1 (smallest), vc_2, vc_3 (largest)
-            sorted_vcs = month_vcs.sort_values("balance")
-            for i, (_, vc_row) in enumerate(sorted_vcs.iterrows(), 1):
-                new_row = vc_row.to_dict()
-                new_row["asset_class"] = f"vc_{i}"
-                result_rows.append(new_row)
-    else:
-        result_rows.append(row.to_dict())
-
-new_df = pd.DataFrame(result_rows)
-new_df.to_csv("data/input/assets.csv", index=False)
-print(f"Fixed {len(new_df)} rows")
+is_vc = (df["account_id"] == "sbi_sec") & (df["asset_class"] == "vc")
+
+# Sort the VC subset once: vc_1 (smallest), vc_2, vc_3 (largest) per month
+vc = df.loc[is_vc].sort_values(["month", "balance"], kind="stable")
+vc_by_month = vc.groupby("month")
+rank = vc_by_month.cumcount() + 1
+is_duplicate = vc_by_month["balance"].transform("size") > 1
+
+duplicate_months = vc.loc[is_duplicate, "month"].unique()
+print(f"Months with duplicate VC entries: {len(duplicate_months)}")
+print(", ".join(duplicate_months))
+
+df.loc[rank.index[is_duplicate], "asset_class"] = "vc_" + rank[is_duplicate].astype(str)
+
+# Keep each month's VC entries together at the first entry's row, in rank order
+position = df.index.to_series()
+position[is_vc] = position[is_vc].groupby(df["month"]).transform("min")
+order = np.lexsort((rank.reindex(df.index, fill_value=0), position))
+df = df.take(order).reset_index(drop=True)
+
+df.to_csv("data/input/assets.csv", index=False)
+print(f"Fixed {len(df)} rows")
 print("\nVC entries (last 20):")
-print(new_df[new_df["asset_class"].str.startswith("vc")].tail(20))
+print(df[df["asset_class"].str.startswith("vc")].tail(20))
@@ -8,8 +8,12 @@ Generates data/calculated/forecast.csv with predicted values.
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from datetime import datetime
-from dateutil.relativedelta import relativedelta
+from pandas.api.types import is_numeric_dtype
+
+from export_common import CSV_CHUNK_ROWS, round_sig_figs
+
+# Columns holding yen amounts (rounded to 1000); the rest are Man-yen or ratios
+YEN_PREFIXES = ("収入_", "支出_", "分類_", "資産_")
 
 
 def calculate_cv(series: pd.Series) -> float:
@@ -34,41 +38,44 @@ def get_bonus_months() -> list[int]:
     return [6, 12]
 
 
-def is_bonus_month(month: int) -> bool:
-    """Check if month is a bonus month."""
-    return month in get_bonus_months()
-
-
 def forecast_salary_income(
-    history: pd.DataFrame, col: str, future_months: list[str], stats: list = None
+    history: pd.DataFrame,
+    col: str,
+    future_months: list[str],
+    history_dates: pd.DatetimeIndex,
+    future_dates: pd.DatetimeIndex,
+    current_year: int,
+    stats: list = None,
 ) -> dict[str, float]:
-    """Forecast salary income with annual raise logic, using recent data."""
+    """Forecast salary income with annual raise logic, using recent data.
+
+    `history_dates` and `future_dates` are the parsed months of `history`
+    and `future_months`, so no month string is parsed here. `current_year`
+    is the year of the last history month.
+    """
     bonus_months = get_bonus_months()
+    # Select the column once; every statistic below filters this Series
+    values = history[col]
     
     # Check if this account is actively used (recent 6 months)
-    recent_values = history[col].tail(6)
+    recent_values = values.tail(6)
     if recent_values.sum() == 0:
         # Account not used recently - return 0
         return {month: 0 for month in future_months}
     
     # Get regular months (non-bonus) from recent data
-    history = history.copy()
-    history["month_num"] = pd.to_datetime(history["month"]).dt.month
-    regular_mask = ~history["month_num"].isin(bonus_months)
+    history_months = history_dates.month
+    regular_mask = ~history_months.isin(bonus_months)
     
     # Use recent 12 months for base calculation
-    recent_history = history.tail(12)
-    recent_regular = recent_history.loc[recent_history["month_num"].isin(
-        [m for m in range(1, 13) if m not in bonus_months]
-    ), col]
+    recent_regular = values.tail(12)[regular_mask[-12:]]
     
     # Calculate annual growth rate from year-over-year comparison
-    current_year = pd.to_datetime(history["month"].max()).year
-    current_year_mask = pd.to_datetime(history["month"]).dt.year == current_year
-    prev_year_mask = pd.to_datetime(history["month"]).dt.year == current_year - 1
+    current_year_mask = history_dates.year == current_year
+    prev_year_mask = history_dates.year == current_year - 1
     
-    current_regular_avg = history.loc[regular_mask & current_year_mask, col].mean()
-    prev_regular_avg = history.loc[regular_mask & prev_year_mask, col].mean()
+    current_regular_avg = values[regular_mask & current_year_mask].mean()
+    prev_regular_avg = values[regular_mask & prev_year_mask].mean()
     
     if prev_regular_avg > 0 and not np.isnan(current_regular_avg) and not np.isnan(prev_regular_avg):
         annual_growth = (current_regular_avg / prev_regular_avg) - 1
@@ -84,25 +91,30 @@ def forecast_salary_income(
         if np.isnan(regular_base):
             regular_base = 0
     
-    forecasts = {}
-    base_year = int(future_months[0].split("-")[0])
-    
-    for month_str in future_months:
-        year = int(month_str.split("-")[0])
-        month_num = int(month_str.split("-")[1])
-        years_ahead = year - base_year  # Compound growth for each year
-        growth_factor = (1 + annual_growth) ** (years_ahead + 1)
-        
-        if is_bonus_month(month_num):
-            # Use recent bonus month values
-            same_month_mask = history["month_num"] == month_num
-            recent_bonus = history.loc[same_month_mask, col].tail(2)
-            bonus_avg = recent_bonus[recent_bonus > 0].mean()
-            if np.isnan(bonus_avg) or bonus_avg == 0:
-                bonus_avg = regular_base * 4  # Estimate if no history
-            forecasts[month_str] = bonus_avg * growth_factor
-        else:
-            forecasts[month_str] = regular_base * growth_factor
+    # Average the two most recent payouts of each bonus month, memoized per
+    # month so the month dispatch and the stats below reuse them
+    bonus_avgs = {}
+    for month_num in bonus_months:
+        recent_bonus = values[history_months == month_num].tail(2)
+        bonus_avg = recent_bonus[recent_bonus > 0].mean()
+        if np.isnan(bonus_avg) or bonus_avg == 0:
+            bonus_avg = regular_base * 4  # Estimate if no history
+        bonus_avgs[month_num] = bonus_avg
+    
+    # Bonus months use their bonus average, all other months the regular base
+    future_month_nums = future_dates.month.to_numpy()
+    base = np.full(len(future_months), regular_base, dtype=np.float64)
+    for month_num, bonus_avg in bonus_avgs.items():
+        base[future_month_nums == month_num] = bonus_avg
+    
+    # Compound growth for each year
+    years_ahead = future_dates.year.to_numpy() - future_dates[0].year
+    growth_factor = (1 + annual_growth) ** (years_ahead + 1)
+    forecasts = dict(zip(future_months, (base * growth_factor).tolist()))
+    
+    # Report the average used for the last forecast bonus month
+    future_bonus_months = future_month_nums[np.isin(future_month_nums, bonus_months)]
+    bonus_avg = bonus_avgs[future_bonus_months[-1]] if len(future_bonus_months) else 0
     
     if stats is not None:
         stats.append({
@@ -133,7 +145,7 @@ def forecast_salary_income(
             "category": "Income",
             "item": col,
             "parameter": "bonus_avg",
-            "value": int(bonus_avg if 'bonus_avg' in locals() else 0),
+            "value": int(bonus_avg),
             "unit": "JPY",
             "description": "Average bonus amount"
         })
@@ -197,10 +209,17 @@ def forecast_other_income(
 
 
 def forecast_expense(
-    history: pd.DataFrame, col: str, future_months: list[str], stats: list = None
+    history: pd.DataFrame,
+    col: str,
+    future_months: list[str],
+    history_dates: pd.DatetimeIndex,
+    future_dates: pd.DatetimeIndex,
+    stats: list = None,
 ) -> dict[str, float]:
-    """Forecast expense using trend adjustment method."""
-    history = history.copy()
+    """Forecast expense using trend adjustment method.
+
+    Month dates are passed in pre-parsed, as for forecast_salary_income.
+    """
     values = history[col]
     cv = calculate_cv(values)
     
@@ -225,24 +244,23 @@ def forecast_expense(
     # Trend ratio: how spending changed year-over-year
     trend_ratio = recent_avg / same_period_last_year_avg if same_period_last_year_avg != 0 else 1
     
-    forecasts = {}
     if cv < 0.3:
         # Fixed expense: 12-month average
         avg = values.tail(12).mean()
-        for month_str in future_months:
-            forecasts[month_str] = avg if not np.isnan(avg) else 0
+        forecasts = dict.fromkeys(future_months, avg if not np.isnan(avg) else 0)
     else:
         # Variable expense: 12-month-ago value × trend ratio
-        history["month_num"] = pd.to_datetime(history["month"]).dt.month
-        for month_str in future_months:
-            month_num = int(month_str.split("-")[1])
-            same_month = history[history["month_num"] == month_num][col]
-            if len(same_month) > 0:
-                same_month_val = same_month.iloc[-1]
-                # Apply trend adjustment
-                forecasts[month_str] = same_month_val * trend_ratio
-            else:
-                forecasts[month_str] = recent_avg * trend_ratio
+        # Lookup table of the latest value per calendar month (index 1-12),
+        # falling back to the recent average for months without history
+        same_month_vals = np.full(13, recent_avg, dtype=np.float64)
+        # First occurrence in the reversed history is the latest one
+        month_nums, latest = np.unique(
+            history_dates.month.to_numpy()[::-1], return_index=True
+        )
+        same_month_vals[month_nums] = values.to_numpy()[::-1][latest]
+        # Apply trend adjustment
+        out = same_month_vals[future_dates.month.to_numpy()] * trend_ratio
+        forecasts = dict(zip(future_months, out.tolist()))
 
 
     if stats is not None:
@@ -277,6 +295,33 @@ def forecast_expense(
 
 
 
+def safe_divide(
+    numerator: pd.Series, denominator: pd.Series, where: pd.Series | None = None
+) -> np.ndarray:
+    """Divide element-wise, with 0.0 where the denominator is 0 or `where` is False."""
+    if where is None:
+        where = denominator != 0
+    return np.divide(
+        numerator.to_numpy(dtype=np.float64),
+        denominator.to_numpy(dtype=np.float64),
+        out=np.zeros(len(numerator)),
+        where=np.asarray(where),
+    )
+
+
+def prefix_sums(values: np.ndarray) -> np.ndarray:
+    """Column-wise prefix sums with a leading zero row, skipping NaNs."""
+    prefix = np.zeros((len(values) + 1, values.shape[1]))
+    np.nancumsum(values, axis=0, out=prefix[1:])
+    return prefix
+
+
+def window_sums(prefix: np.ndarray, window: int) -> np.ndarray:
+    """Trailing sums over up to `window` rows (rolling(min_periods=1).sum())."""
+    end = np.arange(1, len(prefix))
+    return prefix[end] - prefix[np.maximum(end - window, 0)]
+
+
 def calculate_bs_derived(df: pd.DataFrame) -> pd.DataFrame:
     """
     Calculate derived Balance Sheet items (Total Assets, Investment Gain/Loss).
@@ -309,27 +354,33 @@ def calculate_metrics_vectorized(df: pd.DataFrame, geo_return_rate: float) -> pd
     Calculate derived metrics on the combined dataframe using vectorized operations.
     Follows logic from src/use_cases/calculators/metrics.py.
     """
+    # Rolling sums of all flow columns, both windows from one prefix sum
+    flow_cols = [
+        "net_savings",
+        "after_tax_income",
+        "investment_gain_loss",
+        "expenditure",
+    ]
+    prefix = prefix_sums(df[flow_cols].to_numpy(dtype=np.float64))
+    ttm = pd.DataFrame(window_sums(prefix, 12), index=df.index, columns=flow_cols)
+    sums_48 = pd.DataFrame(window_sums(prefix, 48), index=df.index, columns=flow_cols)
+    
     # savings_rate: TTM Net Savings / TTM After Tax Income
-    # Rolling 12 sums
-    ttm_savings = df["net_savings"].rolling(window=12, min_periods=1).sum()
-    ttm_income = df["after_tax_income"].rolling(window=12, min_periods=1).sum()
-    df["savings_rate"] = 0.0
-    mask = ttm_income != 0
-    df.loc[mask, "savings_rate"] = ttm_savings[mask] / ttm_income[mask]
+    df["savings_rate"] = safe_divide(ttm["net_savings"], ttm["after_tax_income"])
     
     # risk_asset_ratio: (Risk + Pension) / Total
-    df["risk_asset_ratio"] = 0.0
-    mask = df["total_financial_assets"] != 0
-    df.loc[mask, "risk_asset_ratio"] = (
-        df.loc[mask, "risk_assets"] + df.loc[mask, "pension_assets"]
-    ) / df.loc[mask, "total_financial_assets"]
+    df["risk_asset_ratio"] = safe_divide(
+        df["risk_assets"] + df["pension_assets"], df["total_financial_assets"]
+    )
     
     # monthly_return: 12-month Geometric Mean of raw returns
     # Raw return = Investment Gain / Prev Month Risk Assets
     prev_risk = df["risk_assets"].shift(1)
-    raw_return = pd.Series(0.0, index=df.index)
     mask = (prev_risk > 0) & (df["investment_gain_loss"].notna())
-    raw_return[mask] = df.loc[mask, "investment_gain_loss"] / prev_risk[mask]
+    raw_return = pd.Series(
+        safe_divide(df["investment_gain_loss"], prev_risk, where=mask),
+        index=df.index,
+    )
     
     # Geometric mean rolling 12
     # Product(1+r)^(1/n) - 1
@@ -343,8 +394,6 @@ def calculate_metrics_vectorized(df: pd.DataFrame, geo_return_rate: float) -> pd
     # For history: we assume normalized.csv has 'benchmark_return' pre-calculated
     # For forecast: we assume it equals the assumed geo_return_rate constant
     # We need to fill forecast rows first
-    is_forecast = df["month"] > df["month"].iloc[len(df) - 360 - 1] # Approximate split
-    # Better: identify which rows originally had NaN benchmark_return
     if "benchmark_return" not in df.columns:
         df["benchmark_return"] = 0.0
     
@@ -358,8 +407,6 @@ def calculate_metrics_vectorized(df: pd.DataFrame, geo_return_rate: float) -> pd
     # Let's assume for forecast, the raw benchmark return is 'geo_return_rate'.
     # So the TTM geom mean will converge to 'geo_return_rate'.
     # We will just fill the column for forecast with the constant.
-    forecast_mask = df["benchmark_return"].isna() | (df["benchmark_return"] == 0) # Simplification
-    # Correct way: Identify forecast rows by index or month
     # We know forecast is appended at end.
     # Actually, normalized.csv has 'benchmark_return' which is ALREADY the TTM value from metrics.py?
     # No, metrics.csv has TTM values. normalized.csv merges metrics.csv.
@@ -374,29 +421,103 @@ def calculate_metrics_vectorized(df: pd.DataFrame, geo_return_rate: float) -> pd
     
     # FI Ratios
     # fi_ratio_12m: TTM Gain / TTM Expense
-    ttm_gain = df["investment_gain_loss"].rolling(window=12, min_periods=1).sum()
-    ttm_expense = df["expenditure"].rolling(window=12, min_periods=1).sum()
-    
-    df["fi_ratio_12m"] = 0.0
-    mask = ttm_expense != 0
-    df.loc[mask, "fi_ratio_12m"] = ttm_gain[mask] / ttm_expense[mask]
+    df["fi_ratio_12m"] = safe_divide(ttm["investment_gain_loss"], ttm["expenditure"])
     
     # fi_ratio_48m: 48m Gain / 48m Expense
-    gain_48 = df["investment_gain_loss"].rolling(window=48, min_periods=1).sum()
-    expense_48 = df["expenditure"].rolling(window=48, min_periods=1).sum()
-    
-    df["fi_ratio_48m"] = 0.0
-    mask = expense_48 != 0
-    df.loc[mask, "fi_ratio_48m"] = gain_48[mask] / expense_48[mask]
+    df["fi_ratio_48m"] = safe_divide(
+        sums_48["investment_gain_loss"], sums_48["expenditure"]
+    )
     
     # fi_ratio_next_12m: (Risk * 0.05) / TTM Expense
-    df["fi_ratio_next_12m"] = 0.0
-    mask = ttm_expense != 0
-    df.loc[mask, "fi_ratio_next_12m"] = (df.loc[mask, "risk_assets"] * 0.05) / ttm_expense[mask]
+    df["fi_ratio_next_12m"] = safe_divide(df["risk_assets"] * 0.05, ttm["expenditure"])
     
     return df
 
 
+def project_balances(
+    net_savings: np.ndarray,
+    pension_contrib: np.ndarray,
+    risk_flow: np.ndarray,
+    cash_flow: np.ndarray,
+    prev_liquid: float,
+    prev_risk: float,
+    prev_pension: float,
+    geo_return: float,
+) -> dict[str, np.ndarray]:
+    """
+    Project Balance Sheet totals (Man-yen) for each forecast month.
+
+    Logic:
+    1. Bank assets don't grow (Flat)
+    2. Risk assets grow by Compounding Return (Capital Gains)
+    3. Surplus (risk_flow) flows to Risk Assets
+    4. Deficit (cash_flow) flows from Liquid Assets
+    Pension assets accumulate contributions only.
+    """
+    # Running sums seeded with the last balance add in the same order as a
+    # month-by-month loop, so the results are identical
+    pension = np.cumsum(np.concatenate(([prev_pension], pension_contrib)))[1:]
+    liquid = np.cumsum(np.concatenate(([prev_liquid], cash_flow)))[1:]
+    
+    # Risk compounding is the only true recurrence; run it on plain floats
+    risk = np.empty(len(risk_flow))
+    balance = prev_risk
+    for i, flow in enumerate(risk_flow.tolist()):
+        balance = balance + balance * geo_return + flow
+        risk[i] = balance
+    
+    # Investment gain/loss
+    # Gain = Total - Prev - Savings
+    # Gain ≈ Risk Growth
+    total = liquid + risk + pension
+    prev_total = np.concatenate(([prev_liquid + prev_risk + prev_pension], total[:-1]))
+    gain_loss = total - prev_total - net_savings
+    
+    return {
+        "pension_assets": pension,
+        "liquid_assets": liquid,
+        "risk_assets": risk,
+        "total_financial_assets": total,
+        "investment_gain_loss": gain_loss,
+    }
+
+
+def round_columns(
+    df: pd.DataFrame, yen_cols: list[str], sig_fig_cols: list[str]
+) -> None:
+    """
+    Round yen columns to the nearest 1000 and the rest to 4 significant figures.
+    Each group is rounded in place as one 2D block.
+    """
+    # np.round keeps NaN and rounds half to even like round(); adding 0.0
+    # folds -0.0 into 0.0 as the integer round-trip did
+    yen_block = np.round(df[yen_cols].to_numpy(dtype=np.float64) / 1000)
+    yen_block = yen_block * 1000 + 0.0
+    df.loc[:, yen_cols] = yen_block
+    # Columns without gaps hold whole thousands, so keep writing them as integers
+    complete_cols = [
+        c for c, gap in zip(yen_cols, np.isnan(yen_block).any(axis=0)) if not gap
+    ]
+    df[complete_cols] = df[complete_cols].astype(np.int64)
+
+    df.loc[:, sig_fig_cols] = round_sig_figs(
+        df[sig_fig_cols].to_numpy(dtype=np.float64)
+    )
+
+
+def pick_target(
+    balances: np.ndarray, candidates: np.ndarray, eligible: np.ndarray
+) -> np.ndarray:
+    """
+    Position of the largest balance among `candidates`, as a 1-element array.
+    Empty if there are no candidates or the largest is not `eligible` for flows.
+    """
+    if len(candidates) == 0:
+        return candidates
+    target = candidates[[np.argmax(balances[candidates])]]
+    return target[eligible[target]]
+
+
 def get_calendar_year(month_str: str) -> int:
     """Get calendar year from 'YYYY-MM' string."""
     return int(month_str.split("-")[0])
@@ -465,23 +586,14 @@ def export_annual_summary(df: pd.DataFrame, output_dir: Path) -> None:
     
     # Rounding (Same rules as forecast.csv)
     # Yen cols: 1000 round
-    yen_prefixes = ("収入_", "支出_", "分類_", "資産_")
     numeric_cols = annual.select_dtypes(include=["float64", "int64"]).columns
-    yen_cols = [c for c in numeric_cols if c.startswith(yen_prefixes)]
+    yen_cols = [c for c in numeric_cols if c.startswith(YEN_PREFIXES)]
     
     # Others (Man-yen, Ratios): 4 sig figs
     # Note: Annual flows for income/expense are huge, Man-yen assets are large.
     sig_fig_cols = [c for c in numeric_cols if c not in yen_cols and c != "year"]
     
-    for col in yen_cols:
-        annual[col] = annual[col].apply(
-            lambda x: round(x / 1000) * 1000 if pd.notna(x) else x
-        )
-        
-    for col in sig_fig_cols:
-        annual[col] = annual[col].apply(
-            lambda x: float(f"{x:.4g}") if pd.notna(x) and x != 0 else x
-        )
+    round_columns(annual, yen_cols, sig_fig_cols)
     
     # Reorder columns: year, 収入, 支出, cashflow, 資産, 分類, BS, metrics
     inc_cols_sorted = sorted([c for c in annual.columns if c.startswith("収入_")])
@@ -506,7 +618,7 @@ def export_annual_summary(df: pd.DataFrame, output_dir: Path) -> None:
         
     # Export
     output_path = output_dir / "forecast_annual.csv"
-    annual.to_csv(output_path, index=False)
+    annual.to_csv(output_path, index=False, chunksize=CSV_CHUNK_ROWS)
     print(f"Exported annual summary to: {output_path}")
 
 
@@ -518,18 +630,32 @@ def main() -> None:
     
     # Load historical data
     # We load normalized.csv which has History (including metrics)
-    history = pd.read_csv(calculated_dir / "normalized.csv")
+    # The multithreaded PyArrow parser infers numeric columns in parallel;
+    # month stays a 'YYYY-MM' string and is parsed once further down
+    history = pd.read_csv(
+        calculated_dir / "normalized.csv", engine="pyarrow", dtype={"month": str}
+    )
+    
+    # Yen columns hold whole yen amounts; keep those without gaps or fractions
+    # as exact int64 rather than float64
+    yen_cols = [c for c in history.columns if c.startswith(YEN_PREFIXES)]
+    yen_block = history[yen_cols].to_numpy(dtype=np.float64)
+    is_whole = (np.isfinite(yen_block) & (yen_block == np.round(yen_block))).all(axis=0)
+    history = history.astype({c: np.int64 for c, w in zip(yen_cols, is_whole) if w})
+    
+    # Parse months once; the forecasters read month and year numbers from these
+    history_dates = pd.DatetimeIndex(pd.to_datetime(history["month"], format="%Y-%m"))
+    last_date = history_dates.max()
+    current_year = last_date.year
     
     # Determine forecast period (next 30 years = 360 months)
-    last_month = history["month"].max()
-    last_date = datetime.strptime(last_month, "%Y-%m")
-    future_months = [
-        (last_date + relativedelta(months=i+1)).strftime("%Y-%m")
-        for i in range(360)
-    ]
+    future_dates = pd.date_range(
+        last_date + pd.DateOffset(months=1), periods=360, freq="MS"
+    )
+    future_months = future_dates.strftime("%Y-%m").tolist()
     
-    # Initialize forecast dataframe
-    forecast = pd.DataFrame({"month": future_months})
+    # Collect forecast columns as arrays; the frame is built once at the end
+    columns: dict[str, object] = {"month": future_months}
     
     # Initialize stats collector
     stats = []
@@ -547,20 +673,35 @@ def main() -> None:
         elif "厚生年金" in col or "確定拠出年金" in col:
             forecasts = forecast_fixed_income(history, col, future_months)
         elif any(x in col for x in ["ゆうちょ", "ソニー", "ドイツ"]):
-            forecasts = forecast_salary_income(history, col, future_months, stats)
+            forecasts = forecast_salary_income(
+                history,
+                col,
+                future_months,
+                history_dates,
+                future_dates,
+                current_year,
+                stats,
+            )
         else:
             forecasts = forecast_other_income(history, col, future_months)
-        forecast[col] = forecast["month"].map(forecasts)
+        # Forecasters key months in future_months order, so row i is month i
+        columns[col] = list(forecasts.values())
     
     # Forecast expenses
     for col in expense_cols:
-        forecasts = forecast_expense(history, col, future_months, stats)
-        forecast[col] = forecast["month"].map(forecasts)
+        forecasts = forecast_expense(
+            history, col, future_months, history_dates, future_dates, stats
+        )
+        columns[col] = list(forecasts.values())
     
     # Calculate cashflow (Raw values)
-    forecast["after_tax_income"] = forecast[income_cols].sum(axis=1) / 10000
-    forecast["expenditure"] = forecast[expense_cols].sum(axis=1) / 10000
-    forecast["net_savings"] = forecast["after_tax_income"] - forecast["expenditure"]
+    income_block = np.array([columns[c] for c in income_cols], dtype=np.float64)
+    expense_block = np.array([columns[c] for c in expense_cols], dtype=np.float64)
+    after_tax_income = income_block.sum(axis=0) / 10000
+    expenditure = expense_block.sum(axis=0) / 10000
+    columns["after_tax_income"] = after_tax_income
+    columns["expenditure"] = expenditure
+    columns["net_savings"] = after_tax_income - expenditure
     
     # Forecast assets
     # Get last values
@@ -600,154 +741,129 @@ def main() -> None:
     risk_classes = ["分類_投資信託", "分類_米国株", "分類_日本株", "分類_FX", "分類_暗号資産", "分類_VC"]
     pension_classes = ["分類_年金"]
     
-    # Initialize previous values for 分類_* columns
-    prev_class_values = {col: last_row.get(col, 0) for col in class_cols}
-    prev_asset_values = {col: last_row.get(col, 0) for col in asset_cols}
-    
-    prev_liquid = last_row.get("liquid_assets", 0)
-    prev_risk = last_row.get("risk_assets", 0)
-    prev_pension = last_row.get("pension_assets", 0)
+    # Classify asset accounts once; the account columns are fixed for the run
+    cash_accounts = [c for c in asset_cols if any(x in c for x in ["ゆうちょ", "ソニー", "WISE", "みんな", "城南", "ドイツ", "現金"])]
+    risk_accounts = [c for c in asset_cols if any(x in c for x in ["SBI証券", "楽天証券", "マネックス", "Binance"])]
+    pension_accounts = [c for c in asset_cols if any(x in c for x in ["厚生年金", "確定拠出年金"])]
+    
+    # Per-kind masks over the class and account columns. The kinds are
+    # exclusive, checked in order pension -> risk -> cash.
+    class_names = np.array(class_cols)
+    class_is_pension = np.isin(class_names, pension_classes)
+    class_is_risk = np.isin(class_names, risk_classes) & ~class_is_pension
+    class_is_cash = np.isin(class_names, cash_classes)
+    class_is_cash &= ~(class_is_pension | class_is_risk)
+    asset_names = np.array(asset_cols)
+    acct_is_pension = np.isin(asset_names, pension_accounts)
+    # Pension accounts are either 厚生年金 or 確定拠出年金
+    acct_is_kosei = acct_is_pension & (np.char.find(asset_names, "厚生年金") >= 0)
+    acct_is_dc = acct_is_pension & ~acct_is_kosei
+    acct_is_risk = np.isin(asset_names, risk_accounts) & ~acct_is_pension
+    acct_is_cash = np.isin(asset_names, cash_accounts)
+    acct_is_cash &= ~(acct_is_pension | acct_is_risk)
+    # Positions of the accounts each flow target is picked from
+    risk_acct_idx = np.flatnonzero(np.isin(asset_names, risk_accounts))
+    cash_acct_idx = np.flatnonzero(np.isin(asset_names, cash_accounts))
+    
+    # Initialize previous values for 分類_* and 資産_* columns
+    prev_class = last_row[class_cols].to_numpy(dtype=np.float64)
+    prev_asset = last_row[asset_cols].to_numpy(dtype=np.float64)
+    
+    # Monthly flows as arrays, read by month position inside the loop
+    net_savings_arr = columns["net_savings"]
+    kosei_arr = np.asarray(columns["収入_厚生年金"])
+    dc_arr = np.asarray(columns["収入_確定拠出年金"])
+    pension_contrib_arr = (kosei_arr + dc_arr) / 10000
+    
+    # Determine Liquid Flow (Net Savings - Pension)
+    # Surplus flows to Risk Assets, Deficit flows from Liquid Assets
+    liquid_flow = net_savings_arr - pension_contrib_arr
+    risk_flow = np.where(liquid_flow > 0, liquid_flow, 0.0)
+    cash_flow = np.where(liquid_flow > 0, 0.0, liquid_flow)
+    
+    balances = project_balances(
+        net_savings_arr,
+        pension_contrib_arr,
+        risk_flow,
+        cash_flow,
+        last_row.get("liquid_assets", 0),
+        last_row.get("risk_assets", 0),
+        last_row.get("pension_assets", 0),
+        geo_return,
+    )
     
-    for month_str in future_months:
-        net_savings = forecast.loc[forecast["month"] == month_str, "net_savings"].values[0]
-        
-        # Calculate Pension Contribution (Flow into Pension Assets)
-        pension_contrib = (
-            forecast.loc[forecast["month"] == month_str, "収入_厚生年金"].values[0] +
-            forecast.loc[forecast["month"] == month_str, "収入_確定拠出年金"].values[0]
-        ) / 10000
-        
-        # Update Pension Assets (Contributions Only - Simplified)
-        # (Pension is conservative, usually treated separately or fixed growth, here just contribs)
-        new_pension = prev_pension + pension_contrib
-        forecast.loc[forecast["month"] == month_str, "pension_assets"] = new_pension
-        
-        # Determine Liquid Flow (Net Savings - Pension)
-        liquid_flow = net_savings - pension_contrib
-        
-        # Logic: 
-        # 1. Bank assets don't grow (Flat)
-        # 2. Risk assets grow by Compounding Return (Capital Gains)
-        # 3. Surplus flows to Risk Assets
-        # 4. Deficit flows from Liquid Assets
-        
-        # Calculate Growth for Risk Assets first (Balance * Return)
-        risk_growth = prev_risk * geo_return
-        
-        if liquid_flow > 0:
-            # Surplus: Invest everything
-            new_liquid = prev_liquid
-            new_risk = prev_risk + risk_growth + liquid_flow
-            
-            class_delta_cash = 0
-            class_delta_risk = liquid_flow # Flow part only (Growth added separately)
-            
-            account_delta_cash = 0
-            account_delta_risk = liquid_flow
-            
-        else:
-            # Deficit: Burn Cash
-            new_liquid = prev_liquid + liquid_flow  # liquid_flow is negative
-            new_risk = prev_risk + risk_growth # Still grows by return
-            
-            class_delta_cash = liquid_flow
-            class_delta_risk = 0
-            
-            account_delta_cash = liquid_flow
-            account_delta_risk = 0
-
-        forecast.loc[forecast["month"] == month_str, "liquid_assets"] = new_liquid
-        forecast.loc[forecast["month"] == month_str, "risk_assets"] = new_risk
-        
-        # Total assets
-        total = new_liquid + new_risk + new_pension
-        forecast.loc[forecast["month"] == month_str, "total_financial_assets"] = total
-        
-        # Investment gain/loss
-        # Gain = Total - Prev - Savings
-        # Gain ≈ Risk Growth
-        prev_total = prev_liquid + prev_risk + prev_pension
-        gain_loss = total - prev_total - net_savings
-        forecast.loc[forecast["month"] == month_str, "investment_gain_loss"] = gain_loss
-        
+    # Preallocate the class and account outputs (one row per month); the
+    # frame is assembled once after the loop instead of cell by cell
+    class_out = np.empty((len(future_months), len(class_cols)))
+    asset_out = np.empty((len(future_months), len(asset_cols)))
+    
+    # Targets are 0- or 1-element position arrays, so adding a flow to a
+    # missing target is a no-op
+    # Default investment destination
+    target_risk_class = np.flatnonzero(class_is_risk & (class_names == "分類_投資信託"))
+    target_cash_class = np.flatnonzero(
+        class_is_cash & (class_names == "分類_現金・預金")
+    )
+    # Determine targets (largest account of each kind) once up front.
+    # Every risk account grows by the same factor and only the target
+    # receives inflows, so the largest risk account stays the largest.
+    target_risk_acc = pick_target(prev_asset, risk_acct_idx, acct_is_risk)
+    target_cash_acc = pick_target(prev_asset, cash_acct_idx, acct_is_cash)
+    
+    growth = 1 + geo_return
+    for i in range(len(future_months)):
         # --- Update Class Columns ---
-        target_risk_class = "分類_投資信託" # Default investment destination
-        target_cash_class = "分類_現金・預金"
-        
-        for col in class_cols:
-            new_val = prev_class_values[col]
-            
-            if col in pension_classes:
-                new_val += pension_contrib * 10000
-            elif col in risk_classes:
-                # Apply Growth to ALL risk classes
-                new_val = new_val * (1 + geo_return)
-                # Add Flow if target
-                if col == target_risk_class and class_delta_risk != 0:
-                    new_val += class_delta_risk * 10000
-            elif col in cash_classes:
-                # No Growth
-                # Add Flow if target
-                if col == target_cash_class and class_delta_cash != 0:
-                    new_val += class_delta_cash * 10000
-            
-            forecast.loc[forecast["month"] == month_str, col] = new_val
-            prev_class_values[col] = new_val
+        prev_class[class_is_pension] += pension_contrib_arr[i] * 10000
+        # Apply Growth to ALL risk classes
+        prev_class[class_is_risk] *= growth
+        # Add Flow if target (no growth on cash)
+        if risk_flow[i] != 0:
+            prev_class[target_risk_class] += risk_flow[i] * 10000
+        if cash_flow[i] != 0:
+            prev_class[target_cash_class] += cash_flow[i] * 10000
+        class_out[i] = prev_class
 
         # --- Update Asset Columns ---
-        cash_accounts = [c for c in asset_cols if any(x in c for x in ["ゆうちょ", "ソニー", "WISE", "みんな", "城南", "ドイツ", "現金"])]
-        risk_accounts = [c for c in asset_cols if any(x in c for x in ["SBI証券", "楽天証券", "マネックス", "Binance"])]
-        pension_accounts = [c for c in asset_cols if any(x in c for x in ["厚生年金", "確定拠出年金"])]
-        
-        # Determine targets
-        current_risk_balances = {c: prev_asset_values.get(c, 0) for c in risk_accounts}
-        if current_risk_balances:
-            target_risk_acc = max(current_risk_balances, key=current_risk_balances.get)
-        else:
-            target_risk_acc = next((c for c in risk_accounts if "SBI" in c), risk_accounts[0] if risk_accounts else None)
-
-        current_cash_balances = {c: prev_asset_values.get(c, 0) for c in cash_accounts}
-        if current_cash_balances:
-            target_cash_acc = max(current_cash_balances, key=current_cash_balances.get)
-        else:
-            target_cash_acc = "資産_現金"
-        
-        for col in asset_cols:
-            new_val = prev_asset_values[col]
-            
-            if col in pension_accounts:
-                if "厚生年金" in col:
-                    new_val += forecast.loc[forecast["month"] == month_str, "収入_厚生年金"].values[0]
-                elif "確定拠出年金" in col:
-                    new_val += forecast.loc[forecast["month"] == month_str, "収入_確定拠出年金"].values[0]
-            
-            elif col in risk_accounts:
-                # Apply Growth to ALL risk accounts
-                new_val = new_val * (1 + geo_return)
-                # Add Flow if target
-                if col == target_risk_acc and account_delta_risk != 0:
-                    new_val += account_delta_risk * 10000
-            
-            elif col in cash_accounts:
-                # No Growth
-                # Add Flow if target
-                if col == target_cash_acc and account_delta_cash != 0:
-                    new_val += account_delta_cash * 10000
-            
-            forecast.loc[forecast["month"] == month_str, col] = new_val
-            prev_asset_values[col] = new_val
-        
-        # Update for next iteration
-        prev_liquid = new_liquid
-        prev_risk = new_risk # (should be the calculated new_risk in loop)
-        # Note: new_risk variable holds the updated total risk assets including growth and flow
-        prev_risk = new_risk # Correct
-        prev_pension = new_pension
+        prev_asset[acct_is_kosei] += kosei_arr[i]
+        prev_asset[acct_is_dc] += dc_arr[i]
+        # Apply Growth to ALL risk accounts
+        prev_asset[acct_is_risk] *= growth
+        # Add Flow if target (no growth on cash)
+        if risk_flow[i] != 0:
+            prev_asset[target_risk_acc] += risk_flow[i] * 10000
+        if cash_flow[i] != 0:
+            prev_asset[target_cash_acc] += cash_flow[i] * 10000
+            # A deficit draws the cash target down, which may leave another
+            # cash account as the largest
+            target_cash_acc = pick_target(prev_asset, cash_acct_idx, acct_is_cash)
+        asset_out[i] = prev_asset
+    
+    # Build the forecast frame in one construction from the collected arrays
+    forecast = pd.DataFrame(
+        columns
+        | balances
+        | dict(zip(class_cols, class_out.T))
+        | dict(zip(asset_cols, asset_out.T))
+    )
     
     # --- METRICS CALCULATION (Using Unified Vectorized Logic) ---
     # 1. Combine History and Forecast (Raw values)
     # We append forecast to history
-    combined = pd.concat([history, forecast], ignore_index=True)
+    # Give both frames the same columns and dtypes first, so concat stacks
+    # them block by block instead of unioning and promoting column by column
+    forecast = forecast.reindex(
+        columns=history.columns.union(forecast.columns, sort=False)
+    )
+    common_dtypes = {
+        c: np.result_type(history[c].dtype, forecast[c].dtype)
+        for c in history.columns
+        if is_numeric_dtype(history[c]) and is_numeric_dtype(forecast[c])
+    }
+    combined = pd.concat(
+        [history.astype(common_dtypes), forecast.astype(common_dtypes)],
+        ignore_index=True,
+        sort=False,
+    )
     
     # 2. Calculate Derived Balance Sheet Items (Total, Gain/Loss)
     # This overwrites manually calculated values in loop with Strict Logic
@@ -758,19 +874,23 @@ def main() -> None:
     combined = calculate_metrics_vectorized(combined, geo_return)
     
     # 4. Rounding
+    # Classify columns in a single pass; the prefix buckets also drive the
+    # column order in step 5
     # Round forecast values to nearest 1000 (yen values)
-    numeric_cols = combined.select_dtypes(include=["float64", "int64"]).columns
-    
-    # All other numeric columns are treated as Yen amounts (round to nearest 1000)
     # This includes: 収入_*, 支出_*, 分類_*, 資産_*
-    yen_prefixes = ("収入_", "支出_", "分類_", "資産_")
-    yen_cols = [c for c in numeric_cols if c.startswith(yen_prefixes)]
-    
+    buckets: dict[str, list[str]] = {p: [] for p in YEN_PREFIXES}
     # Everything else is either Ratio or Man-yen amounts (liquid_assets, etc.)
     # User requested "4 significant figures" for these.
     # This covers: savings_rate, risk_asset_ratio, liquid_assets, risk_assets, 
     # investment_gain_loss, net_savings, etc.
-    sig_fig_cols = [c for c in numeric_cols if c not in yen_cols]
+    sig_fig_cols = []
+    for col, dtype in combined.dtypes.items():
+        prefix = next((p for p in YEN_PREFIXES if col.startswith(p)), None)
+        if prefix is not None:
+            buckets[prefix].append(col)
+        elif dtype in (np.float64, np.int64):
+            sig_fig_cols.append(col)
+    yen_cols = [c for cols in buckets.values() for c in cols]
     
     # Special handling for monthly_alpha: threshold at 0.0001
     # User request: "monthly_alpha <= 0.0001 is zero"
@@ -778,24 +898,16 @@ def main() -> None:
         combined.loc[combined["monthly_alpha"].abs() <= 0.0001, "monthly_alpha"] = 0.0
     
     # Apply rounding
-    for col in yen_cols:
-        combined[col] = combined[col].apply(
-            lambda x: round(x / 1000) * 1000 if pd.notna(x) else x
-        )
-        
-    for col in sig_fig_cols:
-        combined[col] = combined[col].apply(
-            lambda x: float(f"{x:.4g}") if pd.notna(x) and x != 0 else x
-        )
+    round_columns(combined, yen_cols, sig_fig_cols)
     
     # 5. Reorder columns
     # Reconstruct order similarly to export_normalized.py
     
     # Categories
-    income_cols = sorted([c for c in combined.columns if c.startswith("収入_")])
-    expense_cols = sorted([c for c in combined.columns if c.startswith("支出_")])
-    class_cols = sorted([c for c in combined.columns if c.startswith("分類_")])
-    asset_cols = sorted([c for c in combined.columns if c.startswith("資産_")])
+    income_cols = sorted(buckets["収入_"])
+    expense_cols = sorted(buckets["支出_"])
+    class_cols = sorted(buckets["分類_"])
+    asset_cols = sorted(buckets["資産_"])
     
     cashflow_cols = ["after_tax_income", "expenditure", "net_savings"]
     bs_cols = ["liquid_assets", "risk_assets", "pension_assets", "total_financial_assets", "investment_gain_loss"]
@@ -810,14 +922,17 @@ def main() -> None:
     col_order += [c for c in metric_cols if c in combined.columns]
     
     # Add remaining
-    remaining = [c for c in combined.columns if c not in col_order]
+    ordered = set(col_order)
+    remaining = [c for c in combined.columns if c not in ordered]
     col_order += remaining
     
     combined = combined[col_order]
     
     # Export combined data
     output_path = calculated_dir / "forecast.csv"
-    combined.to_csv(output_path, index=False)
+    combined.to_csv(output_path, index=False, chunksize=CSV_CHUNK_ROWS)
+    # Columnar copy for the dashboard, which reads it instead of the CSV
+    combined.to_parquet(output_path.with_suffix(".parquet"), index=False)
     print(f"Exported forecast to: {output_path}")
     print(f"Historical period: {history['month'].min()} to {history['month'].max()}")
     print(f"Forecast period: {future_months[0]} to {future_months[-1]}")
@@ -1,9 +1,49 @@
 import csv
 from pathlib import Path
 
+# Characters that are invalid in an enum member name, mapped to "_"
+ENUM_NAME_TABLE = str.maketrans({"-": "_", " ": "_"})
+
 
 def to_enum(val: str) -> str:
-    return val.upper().replace("-", "_").replace(" ", "_")
+    return val.translate(ENUM_NAME_TABLE).upper()
+
+
+HEADER = '''import sys
+from enum import Enum
+
+if sys.version_info >= (3, 11):
+    from enum import StrEnum
+else:
+
+    class StrEnum(str, Enum):
+        """Minimal enum.StrEnum backport: members format as their values."""
+
+        __str__ = str.__str__
+
+        def __format__(self, spec: str) -> str:
+            return str.__format__(self, spec)
+'''
+
+FOOTER = """# Plain-string ID sets for membership tests without an enum lookup
+ACCOUNT_IDS = frozenset(m.value for m in AccountId)
+ASSET_CLASS_IDS = frozenset(m.value for m in AssetClassId)
+PAYMENT_METHOD_IDS = frozenset(m.value for m in PaymentMethodId)
+"""
+
+# (enum class, master file, ID column)
+ENUMS = [
+    ("AccountId", "accounts.csv", "account_id"),
+    ("AssetClassId", "asset_classes.csv", "class_id"),
+    ("PaymentMethodId", "payment_methods.csv", "method_id"),
+]
+
+
+def enum_block(name: str, path: Path, key: str) -> str:
+    """Render one enum class with a member per master row."""
+    with open(path, encoding="utf-8") as f:
+        members = [f"    {to_enum(r[key])} = '{r[key]}'" for r in csv.DictReader(f)]
+    return "\n".join([f"class {name}(StrEnum):", *members])
 
 
 def main():
@@ -11,30 +51,16 @@ def main():
     master = root / "master"
     dest = root / "src" / "constants.py"
 
-    code = ["from enum import Enum", "", ""]
-
-    code.append("class AccountId(str, Enum):")
-    with open(master / "accounts.csv", encoding="utf-8") as f:
-        for r in csv.DictReader(f):
-            code.append(f"    {to_enum(r['account_id'])} = '{r['account_id']}'")
-    code.append("")
-    code.append("")
-
-    code.append("class AssetClassId(str, Enum):")
-    with open(master / "asset_classes.csv", encoding="utf-8") as f:
-        for r in csv.DictReader(f):
-            code.append(f"    {to_enum(r['class_id'])} = '{r['class_id']}'")
-    code.append("")
-    code.append("")
+    blocks = [enum_block(name, master / file, key) for name, file, key in ENUMS]
+    code = HEADER + "\n\n" + "\n\n\n".join(blocks) + "\n\n\n" + FOOTER
 
-    code.append("class PaymentMethodId(str, Enum):")
-    with open(master / "payment_methods.csv", encoding="utf-8") as f:
-        for r in csv.DictReader(f):
-            code.append(f"    {to_enum(r['method_id'])} = '{r['method_id']}'")
-    code.append("")
+    # Leave the file (and its mtime) alone when nothing changed
+    if dest.exists() and dest.read_text(encoding="utf-8") == code:
+        print(f"{dest} is up to date")
+        return
 
     with open(dest, "w", encoding="utf-8") as f:
-        f.write("\n".join(code) + "\n")
+        f.write(code)
 
     print(f"Generated {dest}")
 
@@ -1,8 +1,11 @@
 """Regenerate assets.csv from legacy.csv with correct column mappings."""
 
+import numpy as np
 import pandas as pd
 import re
 
+MONTH_RE = re.compile(r"\d{4}/\d{2}/")  # Month cell of a data row (2020/09/)
+
 # Based on legacy.csv header analysis:
 # Row 3-6 define columns. Asset data starts around column 23.
 # Columns 33-35 near VC area:
@@ -37,50 +40,45 @@ COLUMN_MAP = {
 }
 
 
-def parse_value(val):
-    """Parse a value like ¥1,234,567 or 1234567 to int."""
-    if pd.isna(val) or val == "" or val == "¥0":
-        return None
-    val = str(val).replace("¥", "").replace(",", "").replace('"', "").strip()
-    if val == "" or val == "0":
-        return None
-    try:
-        return int(float(val))
-    except (ValueError, TypeError):
-        return None
-
+def parse_values(values: pd.Series) -> pd.Series:
+    """Parse values like ¥1,234,567 or 1234567 to whole yen (NaN if unparseable)."""
+    text = values.astype(str).str.replace(r'[¥,"]', "", regex=True).str.strip()
+    return np.trunc(pd.to_numeric(text, errors="coerce"))
 
-# Read the CSV skipping the header rows
-df = pd.read_csv("data/input/legacy.csv", skiprows=7, header=None, encoding="utf-8")
 
-assets_data = []
+# Read the CSV skipping the header rows. Cells stay strings (¥1,234 style)
+# until parse_values, so the parser skips type inference, and only the month
+# column and the mapped asset columns are parsed at all. The C engine pads
+# short rows (the sheet's footer) instead of rejecting them as PyArrow does.
+usecols = [0, *COLUMN_MAP]
+df = pd.read_csv(
+    "data/input/legacy.csv",
+    skiprows=7,
+    header=None,
+    usecols=usecols,
+    encoding="utf-8",
+    dtype=str,
+)
 
-for idx, row in df.iterrows():
-    # First column is the month (format: 2020/09/)
-    month_raw = str(row[0]).strip()
-    if not month_raw or not re.match(r"\d{4}/\d{2}/", month_raw):
-        continue
+# First column is the month (format: 2020/09/); other rows are not data
+month_raw = df[0].astype(str).str.strip()
+is_month = month_raw.str.match(MONTH_RE)
 
-    # Convert 2020/09/ to 2020-09
-    month = month_raw.replace("/", "-")[:7]
+# Parse every mapped column of the data rows in one vectorized pass
+mapped_cols = list(COLUMN_MAP)
+balances = df.loc[is_month, mapped_cols].apply(parse_values)
 
-    for col_idx, (account_id, asset_class) in COLUMN_MAP.items():
-        if col_idx >= len(row):
-            continue
+# Label rows by month (2020/09/ -> 2020-09) and columns by account/class
+balances.index = month_raw[is_month].str.replace("/", "-").str[:7].rename("month")
+balances.columns = pd.MultiIndex.from_tuples(
+    [COLUMN_MAP[c] for c in mapped_cols], names=["account_id", "asset_class"]
+)
 
-        balance = parse_value(row[col_idx])
-        if balance is not None and balance > 0:
-            assets_data.append(
-                {
-                    "month": month,
-                    "account_id": account_id,
-                    "asset_class": asset_class,
-                    "balance": balance,
-                }
-            )
+# Stack to one row per (month, account_id, asset_class) and keep balances
+result_df = balances.stack(["account_id", "asset_class"]).rename("balance")
+result_df = result_df[result_df > 0].astype(np.int64).reset_index()
 
-# Create DataFrame and save
-result_df = pd.DataFrame(assets_data)
+# Sort and save
 result_df = result_df.sort_values(["month", "account_id", "asset_class"])
 result_df.to_csv("data/input/assets.csv", index=False)
 
@@ -1,7 +1,20 @@
+import sys
 from enum import Enum
 
+if sys.version_info >= (3, 11):
+    from enum import StrEnum
+else:
 
-class AccountId(str, Enum):
+    class StrEnum(str, Enum):
+        """Minimal enum.StrEnum backport: members format as their values."""
+
+        __str__ = str.__str__
+
+        def __format__(self, spec: str) -> str:
+            return str.__format__(self, spec)
+
+
+class AccountId(StrEnum):
     YUCHO = "yucho"
     SONY = "sony"
     DEUTSCHE = "deutsche"
@@ -16,7 +29,7 @@ class AccountId(str, Enum):
     DC = "dc"
 
 
-class AssetClassId(str, Enum):
+class AssetClassId(StrEnum):
     CASH = "cash"
     STOCK_JP = "stock_jp"
     STOCK_US = "stock_us"
@@ -27,7 +40,7 @@ class AssetClassId(str, Enum):
     VC = "vc"
 
 
-class PaymentMethodId(str, Enum):
+class PaymentMethodId(StrEnum):
     SMBC_1 = "smbc_1"
     SMBC_2 = "smbc_2"
     RAKUTEN_1 = "rakuten_1"
@@ -42,7 +55,7 @@ class PaymentMethodId(str, Enum):
     SMBC_NUMBERLESS = "smbc_numberless"
 
 
-class AccountType(str, Enum):
+class AccountType(StrEnum):
     BANK = "bank"
     SECURITIES = "securities"
     CRYPTO = "crypto"
@@ -50,8 +63,14 @@ class AccountType(str, Enum):
     FINTECH = "fintech"
 
 
-class Currency(str, Enum):
+class Currency(StrEnum):
     JPY = "JPY"
     USD = "USD"
     EUR = "EUR"
     MULTI = "multi"
+
+
+# Plain-string ID sets for membership tests without an enum lookup
+ACCOUNT_IDS = frozenset(m.value for m in AccountId)
+ASSET_CLASS_IDS = frozenset(m.value for m in AssetClassId)
+PAYMENT_METHOD_IDS = frozenset(m.value for m in PaymentMethodId)
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from typing import NewType, Optional
+import numpy as np
 
 # Value Objects / Type Aliases
 from src.constants import (
@@ -13,21 +14,32 @@ from src.constants import (
 Month = NewType("Month", str)
 
 
-@dataclass(frozen=True)
+def month_index(month: str) -> int:
+    """Running month number of a "YYYY-MM" month: year * 12 + month - 1."""
+    return int(month[:4]) * 12 + int(month[5:7]) - 1
+
+
+def month_label(index: int) -> Month:
+    """Inverse of month_index."""
+    year, month = divmod(index, 12)
+    return Month(f"{year:04d}-{month + 1:02d}")
+
+
+@dataclass(frozen=True, slots=True)
 class Income:
     month: Month
     account_id: AccountId
     amount: int  # JPY
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Expense:
     month: Month
     method_id: PaymentMethodId
     amount: int  # JPY (Negative for adjustments)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Asset:
     month: Month
     account_id: AccountId
@@ -35,7 +47,7 @@ class Asset:
     balance: float  # Original Currency
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Market:
     month: Month
     usd_jpy: float
@@ -43,7 +55,7 @@ class Market:
     sp500: float
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Account:
     id: AccountId
     name: str
@@ -52,8 +64,35 @@ class Account:
     risk: int  # 0 or 1
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PaymentMethod:
     id: PaymentMethodId
     name: str
     settlement_account: Optional[AccountId]  # Link to Account
+
+
+# Column-oriented batches: one array per field, one element per entity
+
+
+@dataclass(frozen=True, slots=True)
+class AssetBatch:
+    month_idx: np.ndarray  # int32, month_index of each Month
+    account_ids: np.ndarray  # AccountId
+    asset_classes: np.ndarray  # AssetClassId
+    balances: np.ndarray  # float64, Original Currency
+
+
+@dataclass(frozen=True, slots=True)
+class MarketBatch:
+    month_idx: np.ndarray  # int32, month_index of each Month
+    usd_jpy: np.ndarray  # float64
+    eur_jpy: np.ndarray  # float64
+    sp500: np.ndarray  # float64
+
+
+@dataclass(frozen=True, slots=True)
+class AccountBatch:
+    ids: np.ndarray  # AccountId
+    types: np.ndarray  # AccountType
+    currencies: np.ndarray  # Currency
+    risks: np.ndarray  # int64, 0 or 1
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from typing import List
+import pandas as pd
 from src.domain.entities.models import (
     Income,
     Expense,
@@ -7,6 +8,9 @@ from src.domain.entities.models import (
     Market,
     Account,
     PaymentMethod,
+    AssetBatch,
+    MarketBatch,
+    AccountBatch,
 )
 
 
@@ -19,24 +23,51 @@ class ITransactionRepository(ABC):
     def get_expenses(self) -> List[Expense]:
         pass
 
+    @abstractmethod
+    def get_incomes_df(self) -> pd.DataFrame:
+        """Incomes as columns: month, account_id (category), amount."""
+        pass
+
+    @abstractmethod
+    def get_expenses_df(self) -> pd.DataFrame:
+        """Expenses as columns: month, method_id (category), amount."""
+        pass
+
 
 class IAssetRepository(ABC):
     @abstractmethod
     def get_assets(self) -> List[Asset]:
         pass
 
+    @abstractmethod
+    def get_assets_df(self) -> pd.DataFrame:
+        """Assets as columns: month, account_id, asset_class (categories), balance."""
+        pass
+
+    @abstractmethod
+    def get_assets_batch(self) -> AssetBatch:
+        pass
+
 
 class IMarketRepository(ABC):
     @abstractmethod
     def get_market_data(self) -> List[Market]:
         pass
 
+    @abstractmethod
+    def get_market_batch(self) -> MarketBatch:
+        pass
+
 
 class IMasterRepository(ABC):
     @abstractmethod
     def get_accounts(self) -> List[Account]:
         pass
 
+    @abstractmethod
+    def get_accounts_batch(self) -> AccountBatch:
+        pass
+
     @abstractmethod
     def get_payment_methods(self) -> List[PaymentMethod]:
         pass
@@ -1,4 +1,8 @@
 import os
+from collections.abc import Sequence
+from operator import attrgetter
+from typing import Protocol
+import numpy as np
 import pandas as pd
 from injector import Injector
 from src.infrastructure.di.container import AppModule
@@ -11,6 +15,30 @@ from src.domain.repositories.interfaces import (
 from src.use_cases.calculators.cash_flow import CashFlowCalculator
 from src.use_cases.calculators.balance_sheet import BalanceSheetCalculator
 from src.use_cases.calculators.metrics import MetricsCalculator
+from src.domain.entities.models import Month
+
+
+class MonthlyStatement(Protocol):
+    """Any statement DTO with a month, e.g. CashFlowStatement."""
+
+    @property
+    def month(self) -> Month: ...
+
+
+def statements_frame(
+    statements: Sequence[MonthlyStatement], fields: list[str], scale: float = 1
+) -> pd.DataFrame:
+    """Build an export frame from statement attributes in one block.
+
+    The numeric fields are gathered into a single float64 array and scaled
+    with one vectorized division, with 'month' as the first column.
+    """
+    getter = attrgetter(*fields)
+    block = np.array([getter(s) for s in statements], dtype=np.float64)
+    block = block.reshape(len(statements), len(fields))
+    df = pd.DataFrame(block / scale, columns=fields)
+    df.insert(0, "month", [s.month for s in statements])
+    return df
 
 
 def main() -> None:
@@ -31,9 +59,9 @@ def main() -> None:
     print("Loading data...")
     incomes = transaction_repo.get_incomes()
     expenses = transaction_repo.get_expenses()
-    assets = asset_repo.get_assets()
-    markets = market_repo.get_market_data()
-    accounts = master_repo.get_accounts()
+    assets = asset_repo.get_assets_batch()
+    markets = market_repo.get_market_batch()
+    accounts = master_repo.get_accounts_batch()
 
     print("Calculating Cash Flow...")
     cf_statements = cf_calculator.calculate(incomes, expenses)
@@ -48,55 +76,45 @@ def main() -> None:
     output_dir = os.path.join(root_dir, "data", "calculated")
     os.makedirs(output_dir, exist_ok=True)
 
-    # 1. Cash Flow
-    cf_data = []
-    for cf in cf_statements:
-        cf_data.append(
-            {
-                "month": cf.month,
-                "after_tax_income": cf.after_tax_income / 10000,  # Convert to Man-Yen
-                "expenditure": cf.expenditure / 10000,
-                "net_savings": cf.net_savings / 10000,
-            }
-        )
-    pd.DataFrame(cf_data).to_csv(
+    # 1. Cash Flow (converted to Man-Yen)
+    cf_df = statements_frame(
+        cf_statements, ["after_tax_income", "expenditure", "net_savings"], 10000
+    )
+    cf_df.to_csv(
         os.path.join(output_dir, "cashflow.csv"), index=False, float_format="%.4g"
     )
 
-    # 2. Balance Sheet
-    bs_data = []
-    for bs in bs_statements:
-        bs_data.append(
-            {
-                "month": bs.month,
-                "liquid_assets": bs.liquid_assets / 10000,
-                "risk_assets": bs.risk_assets / 10000,
-                "pension_assets": bs.pension_assets / 10000,
-                "total_financial_assets": bs.total_financial_assets / 10000,
-                "investment_gain_loss": bs.investment_gain_loss / 10000,
-            }
-        )
-    pd.DataFrame(bs_data).to_csv(
+    # 2. Balance Sheet (converted to Man-Yen)
+    bs_df = statements_frame(
+        bs_statements,
+        [
+            "liquid_assets",
+            "risk_assets",
+            "pension_assets",
+            "total_financial_assets",
+            "investment_gain_loss",
+        ],
+        10000,
+    )
+    bs_df.to_csv(
         os.path.join(output_dir, "balance_sheet.csv"), index=False, float_format="%.4g"
     )
 
     # 3. Metrics
-    metrics_data = []
-    for m in metrics:
-        metrics_data.append(
-            {
-                "month": m.month,
-                "savings_rate": m.savings_rate,
-                "risk_asset_ratio": m.risk_asset_ratio,
-                "monthly_return": m.monthly_return,
-                "monthly_alpha": m.monthly_alpha,
-                "benchmark_return": m.benchmark_return,
-                "fi_ratio_12m": m.fi_ratio_12m,
-                "fi_ratio_48m": m.fi_ratio_48m,
-                "fi_ratio_next_12m": m.fi_ratio_next_12m,
-            }
-        )
-    pd.DataFrame(metrics_data).to_csv(
+    metrics_df = statements_frame(
+        metrics,
+        [
+            "savings_rate",
+            "risk_asset_ratio",
+            "monthly_return",
+            "monthly_alpha",
+            "benchmark_return",
+            "fi_ratio_12m",
+            "fi_ratio_48m",
+            "fi_ratio_next_12m",
+        ],
+    )
+    metrics_df.to_csv(
         os.path.join(output_dir, "metrics.csv"), index=False, float_format="%.4g"
     )
 
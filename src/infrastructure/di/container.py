@@ -6,6 +6,7 @@ from src.domain.repositories.interfaces import (
     IMasterRepository,
 )
 from src.interface_adapters.repositories.csv_repository import (
+    Datasets,
     CsvTransactionRepository,
     CsvAssetRepository,
     CsvMarketRepository,
@@ -22,23 +23,31 @@ class AppModule(Module):
 
     @singleton
     @provider
-    def provide_transaction_repository(self) -> ITransactionRepository:
-        return CsvTransactionRepository(self.key_dir)
+    def provide_datasets(self) -> Datasets:
+        # Parse every CSV once per injector; repositories share the frames
+        return Datasets.load(self.key_dir)
 
     @singleton
     @provider
-    def provide_asset_repository(self) -> IAssetRepository:
-        return CsvAssetRepository(self.key_dir)
+    def provide_transaction_repository(
+        self, datasets: Datasets
+    ) -> ITransactionRepository:
+        return CsvTransactionRepository(datasets)
 
     @singleton
     @provider
-    def provide_market_repository(self) -> IMarketRepository:
-        return CsvMarketRepository(self.key_dir)
+    def provide_asset_repository(self, datasets: Datasets) -> IAssetRepository:
+        return CsvAssetRepository(datasets)
 
     @singleton
     @provider
-    def provide_master_repository(self) -> IMasterRepository:
-        return CsvMasterRepository(self.key_dir)
+    def provide_market_repository(self, datasets: Datasets) -> IMarketRepository:
+        return CsvMarketRepository(datasets)
+
+    @singleton
+    @provider
+    def provide_master_repository(self, datasets: Datasets) -> IMasterRepository:
+        return CsvMasterRepository(datasets)
 
     @singleton
     @provider
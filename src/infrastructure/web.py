@@ -2,11 +2,39 @@
 
 import os
 import datetime
+from collections.abc import Callable, Mapping, Sequence
+from functools import lru_cache
+from typing import TypeVar
 import pandas as pd
 from dateutil.relativedelta import relativedelta
-from flask import Flask, render_template, request, redirect, url_for
+from flask import (
+    Flask,
+    Response,
+    make_response,
+    render_template,
+    request,
+    redirect,
+    url_for,
+)
 
-from src.use_cases.graph_service import GraphService
+from src.use_cases.graph_service import CHART_LAYOUTS_JS, PLOTLY_JS_URL, GraphService
+
+# The master lookups load_master can return
+MasterMap = TypeVar("MasterMap", dict[str, str], dict[str, tuple[str, int]])
+
+
+@lru_cache(maxsize=1)
+def _load_accounts_map(path: str, mtime_ns: int) -> dict[str, str]:
+    """Read the accounts master as account_id -> name (cached per file version)."""
+    df = pd.read_csv(path)
+    return dict(zip(df["account_id"], df["name"]))
+
+
+@lru_cache(maxsize=1)
+def _load_methods_map(path: str, mtime_ns: int) -> dict[str, tuple[str, int]]:
+    """Read the payment methods master as method_id -> (name, settlement_day)."""
+    df = pd.read_csv(path)
+    return dict(zip(df["method_id"], zip(df["name"], df["settlement_day"])))
 
 
 def create_app() -> Flask:
@@ -22,6 +50,12 @@ def create_app() -> Flask:
     # Configuration constants
     MA_MONTHS = 6  # Number of months for moving average / extrapolation
     CREDIT_CARD_MIN_SETTLEMENT_DAY = 1  # settlement_day >= this = credit card
+    CHART_CACHE_SIZE = 128  # Rendered chart fragments kept in memory
+    CHART_MAX_AGE = 30  # Seconds the browser may reuse a chart fragment
+
+    # Rendered chart fragments keyed by (chart, months, forecast, data version)
+    chart_cache: dict[tuple[str, int | None, int | None, int], str] = {}
+    forecast_path = os.path.join(root_dir, "data", "calculated", "forecast.csv")
 
     def get_data_path(filename: str) -> str:
         return os.path.join(root_dir, "data", "input", filename)
@@ -30,12 +64,75 @@ def create_app() -> Flask:
         path = get_data_path(filename)
         if not os.path.exists(path):
             return pd.DataFrame()
-        return pd.read_csv(path)
+        # Months repeat on every row; as a categorical, sorting the distinct
+        # months and isin() work on the small set of categories
+        return pd.read_csv(path, engine="pyarrow", dtype={"month": "category"})
+
+    def recent_months(df: pd.DataFrame) -> pd.Index:
+        """Return the last MA_MONTHS months in df (categories are sorted)."""
+        return df["month"].cat.categories[-MA_MONTHS:]
+
+    def append_csv(
+        filename: str, rows: Sequence[Mapping[str, object]], columns: list[str]
+    ) -> None:
+        """Append rows to an input CSV without rereading or rewriting it."""
+        path = get_data_path(filename)
+        has_rows = os.path.exists(path) and os.path.getsize(path) > 0
+        ends_with_newline = True
+        if has_rows:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                ends_with_newline = f.read(1) == b"\n"
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            if not ends_with_newline:
+                f.write("\n")
+            # Header only for a new (or empty) file
+            pd.DataFrame(rows, columns=columns).to_csv(
+                f, header=not has_rows, index=False
+            )
+
+    def load_master(
+        loader: Callable[[str, int], MasterMap], filename: str
+    ) -> MasterMap:
+        """Load a master CSV lookup; the file's mtime keys the cache."""
+        path = os.path.join(root_dir, "master", filename)
+        if not os.path.exists(path):
+            return {}
+        return loader(path, os.stat(path).st_mtime_ns)
+
+    def chart_response(render: Callable[[int | None, int | None], str]) -> Response:
+        """Render a chart for the request's query, reused while the data is unchanged.
+
+        Charts are pure functions of forecast.csv and the query, so its mtime
+        is part of the cache key and a regenerated forecast invalidates them.
+        """
+        months = request.args.get("months", type=int)
+        forecast = request.args.get("forecast", type=int)
+        key = (render.__name__, months, forecast, os.stat(forecast_path).st_mtime_ns)
+        html = chart_cache.get(key)
+        if html is None:
+            if len(chart_cache) >= CHART_CACHE_SIZE:
+                chart_cache.clear()
+            html = chart_cache[key] = render(months, forecast)
+        response = make_response(html)
+        response.headers["Cache-Control"] = f"private, max-age={CHART_MAX_AGE}"
+        return response
+
+    # Prerender the full-history view of every chart, which the dashboard
+    # requests on load; chart_response re-renders once forecast.csv changes
+    if os.path.exists(forecast_path):
+        mtime_ns = os.stat(forecast_path).st_mtime_ns
+        for name, html in graph_service.render_all().items():
+            chart_cache[(f"get_{name}_chart", None, None, mtime_ns)] = html
 
     @app.route("/")
     def dashboard() -> str:
         """Render the main dashboard page."""
-        return render_template("dashboard.html")
+        return render_template(
+            "dashboard.html",
+            plotly_js_url=PLOTLY_JS_URL,
+            chart_layouts=CHART_LAYOUTS_JS,
+        )
 
     @app.route("/input", methods=["GET", "POST"])
     def input_view() -> str:
@@ -80,32 +177,21 @@ def create_app() -> Flask:
                         }
                     )
 
-            # 2. Save
+            # 2. Save (append the new rows only)
             if new_income:
-                df = load_csv("income.csv")
-                new_df = pd.DataFrame(new_income)
-                # Ensure correct columns if file empty
-                if df.empty:
-                    df = pd.DataFrame(columns=["month", "account_id", "amount"])
-                pd.concat([df, new_df]).to_csv(get_data_path("income.csv"), index=False)
+                append_csv("income.csv", new_income, ["month", "account_id", "amount"])
 
             if new_expenses:
-                df = load_csv("expense.csv")
-                new_df = pd.DataFrame(new_expenses)
-                if df.empty:
-                    df = pd.DataFrame(columns=["month", "method_id", "amount"])
-                pd.concat([df, new_df]).to_csv(
-                    get_data_path("expense.csv"), index=False
+                append_csv(
+                    "expense.csv", new_expenses, ["month", "method_id", "amount"]
                 )
 
             if new_assets:
-                df = load_csv("assets.csv")
-                new_df = pd.DataFrame(new_assets)
-                if df.empty:
-                    df = pd.DataFrame(
-                        columns=["month", "account_id", "asset_class", "balance"]
-                    )
-                pd.concat([df, new_df]).to_csv(get_data_path("assets.csv"), index=False)
+                append_csv(
+                    "assets.csv",
+                    new_assets,
+                    ["month", "account_id", "asset_class", "balance"],
+                )
 
             return redirect(url_for("dashboard"))
 
@@ -126,35 +212,23 @@ def create_app() -> Flask:
                 target_month = (last_date + relativedelta(months=1)).strftime("%Y-%m")
 
             # Get last 6 months for averaging
-            months_list = (
-                sorted(income_df["month"].unique())[-MA_MONTHS:]
-                if not income_df.empty
-                else []
-            )
+            months_list = recent_months(income_df) if not income_df.empty else []
 
             # Pre-fill Income (6MA) - load names from master
             income_items = []
-            accounts_path = os.path.join(root_dir, "master", "accounts.csv")
-            accounts_df = (
-                pd.read_csv(accounts_path)
-                if os.path.exists(accounts_path)
-                else pd.DataFrame()
-            )
+            accounts_map = load_master(_load_accounts_map, "accounts.csv")
 
             if not income_df.empty:
                 recent_income = income_df[income_df["month"].isin(months_list)]
-                for acc in recent_income["account_id"].unique():
-                    avg = int(
-                        recent_income[recent_income["account_id"] == acc][
-                            "amount"
-                        ].mean()
-                    )
+                # One grouped pass for every account's 6MA, in first-seen order
+                income_avgs = (
+                    recent_income.groupby("account_id", sort=False)["amount"]
+                    .mean()
+                    .astype(int)
+                )
+                for acc, avg in income_avgs.items():
                     # Get account name from master
-                    name = acc
-                    if not accounts_df.empty:
-                        acc_row = accounts_df[accounts_df["account_id"] == acc]
-                        if not acc_row.empty:
-                            name = acc_row.iloc[0]["name"]
+                    name = accounts_map.get(acc, acc)
                     income_items.append(
                         {"account_id": acc, "name": name, "amount": avg}
                     )
@@ -164,26 +238,18 @@ def create_app() -> Flask:
             other_expense_items = []
 
             # Load payment methods master
-            methods_path = os.path.join(root_dir, "master", "payment_methods.csv")
-            methods_df = (
-                pd.read_csv(methods_path)
-                if os.path.exists(methods_path)
-                else pd.DataFrame()
-            )
+            methods_map = load_master(_load_methods_map, "payment_methods.csv")
 
-            if not expense_df.empty and not methods_df.empty:
-                exp_months = sorted(expense_df["month"].unique())[-MA_MONTHS:]
+            if not expense_df.empty and methods_map:
+                exp_months = recent_months(expense_df)
                 recent_exp = expense_df[expense_df["month"].isin(exp_months)]
+                # Calculate 6MA for all methods at once
+                exp_avgs = (
+                    recent_exp.groupby("method_id")["amount"].mean().astype(int)
+                ).to_dict()
 
-                for _, method in methods_df.iterrows():
-                    met = method["method_id"]
-                    name = method["name"]
-                    settlement_day = method["settlement_day"]
-
-                    # Calculate 6MA
-                    met_data = recent_exp[recent_exp["method_id"] == met]
-                    avg = int(met_data["amount"].mean()) if not met_data.empty else 0
-
+                for met, (name, settlement_day) in methods_map.items():
+                    avg = exp_avgs.get(met, 0)
                     item = {"method_id": met, "name": name, "amount": avg}
 
                     # Credit cards have settlement_day >= threshold
@@ -195,50 +261,48 @@ def create_app() -> Flask:
             # Pre-fill Assets (linear extrapolation from 6 months)
             asset_items = []
             if not asset_df.empty:
-                asset_months = sorted(asset_df["month"].unique())[-MA_MONTHS:]
+                asset_months = recent_months(asset_df)
                 recent_assets = asset_df[asset_df["month"].isin(asset_months)]
                 last_month_str = asset_df["month"].iloc[-1]
 
                 # Aggregate duplicates: group by account_id + asset_class and sum
+                # (groupby returns the pairs already sorted by both keys)
                 last_assets = (
                     asset_df[asset_df["month"] == last_month_str]
                     .groupby(["account_id", "asset_class"], as_index=False)["balance"]
                     .sum()
-                    .sort_values(by=["account_id", "asset_class"])
                 )
 
-                for _, row in last_assets.iterrows():
-                    acc, cls = row["account_id"], row["asset_class"]
-                    # Get history for this account/class (aggregated per month)
-                    history = recent_assets[
-                        (recent_assets["account_id"] == acc)
-                        & (recent_assets["asset_class"] == cls)
-                    ]
-                    history_agg = history.groupby("month")["balance"].sum().sort_index()
-
-                    if len(history_agg) >= 2:
-                        # Linear extrapolation: y = last + slope
-                        values = history_agg.values
-                        slope = (values[-1] - values[0]) / len(values)
-                        extrapolated = max(0, int(values[-1] + slope))  # No negative
-                    else:
-                        extrapolated = int(row["balance"])
-
-                    # Get account name from master
-                    name = acc
-                    if not accounts_df.empty:
-                        acc_row = accounts_df[accounts_df["account_id"] == acc]
-                        if not acc_row.empty:
-                            name = acc_row.iloc[0]["name"]
-
-                    asset_items.append(
-                        {
-                            "account_id": acc,
-                            "name": name,
-                            "asset_class": cls,
-                            "balance": extrapolated,
-                        }
-                    )
+                # History per account/class (aggregated per month, in month
+                # order), reduced to its first and last months in one pass
+                history = recent_assets.groupby(
+                    ["account_id", "asset_class", "month"], observed=True
+                )["balance"].sum()
+                history_agg = history.groupby(level=["account_id", "asset_class"])
+                first, last = history_agg.first(), history_agg.last()
+                n_months = history_agg.size()
+
+                # Linear extrapolation: y = last + slope (no negative)
+                slope = (last - first) / n_months
+                trend = (last + slope).clip(lower=0)[n_months >= 2]
+                last_assets = last_assets.join(
+                    trend.rename("extrapolated"), on=["account_id", "asset_class"]
+                )
+                # Pairs with under 2 months of history keep their last balance
+                last_assets["balance"] = (
+                    last_assets["extrapolated"]
+                    .fillna(last_assets["balance"])
+                    .astype(int)
+                )
+                # Get account names from master
+                last_assets["name"] = (
+                    last_assets["account_id"]
+                    .map(accounts_map)
+                    .fillna(last_assets["account_id"])
+                )
+                asset_items = last_assets[
+                    ["account_id", "name", "asset_class", "balance"]
+                ].to_dict("records")
 
             return render_template(
                 "input.html",
@@ -250,46 +314,34 @@ def create_app() -> Flask:
             )
 
     @app.route("/graphs/net-worth")
-    def net_worth_graph() -> str:
+    def net_worth_graph() -> Response:
         """Return net worth chart HTML fragment."""
-        months = request.args.get("months", type=int)
-        forecast = request.args.get("forecast", type=int)
-        return graph_service.get_net_worth_chart(months, forecast)
+        return chart_response(graph_service.get_net_worth_chart)
 
     @app.route("/graphs/cashflow")
-    def cashflow_graph() -> str:
+    def cashflow_graph() -> Response:
         """Return cash flow chart HTML fragment."""
-        months = request.args.get("months", type=int)
-        forecast = request.args.get("forecast", type=int)
-        return graph_service.get_cashflow_chart(months, forecast)
+        return chart_response(graph_service.get_cashflow_chart)
 
     @app.route("/graphs/allocation")
-    def allocation_graph() -> str:
+    def allocation_graph() -> Response:
         """Return asset allocation chart HTML fragment."""
-        months = request.args.get("months", type=int)
-        forecast = request.args.get("forecast", type=int)
-        return graph_service.get_allocation_chart(months, forecast)
+        return chart_response(graph_service.get_allocation_chart)
 
     @app.route("/graphs/ratios")
-    def ratios_graph() -> str:
+    def ratios_graph() -> Response:
         """Return financial ratios chart HTML fragment."""
-        months = request.args.get("months", type=int)
-        forecast = request.args.get("forecast", type=int)
-        return graph_service.get_ratios_chart(months, forecast)
+        return chart_response(graph_service.get_ratios_chart)
 
     @app.route("/graphs/returns")
-    def returns_graph() -> str:
+    def returns_graph() -> Response:
         """Return investment returns chart HTML fragment."""
-        months = request.args.get("months", type=int)
-        forecast = request.args.get("forecast", type=int)
-        return graph_service.get_returns_chart(months, forecast)
+        return chart_response(graph_service.get_returns_chart)
 
     @app.route("/graphs/fi")
-    def fi_graph() -> str:
+    def fi_graph() -> Response:
         """Return FI ratios chart HTML fragment."""
-        months = request.args.get("months", type=int)
-        forecast = request.args.get("forecast", type=int)
-        return graph_service.get_fi_chart(months, forecast)
+        return chart_response(graph_service.get_fi_chart)
 
     return app
 
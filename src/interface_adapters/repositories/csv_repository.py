@@ -1,5 +1,9 @@
+import numpy as np
 import pandas as pd
-from typing import List
+from dataclasses import dataclass
+from enum import Enum
+from functools import wraps
+from typing import Any, Callable, List, TypeVar, cast
 from src.domain.entities.models import (
     Income,
     Expense,
@@ -7,6 +11,9 @@ from src.domain.entities.models import (
     Market,
     Account,
     PaymentMethod,
+    AssetBatch,
+    MarketBatch,
+    AccountBatch,
 )
 from src.constants import (
     AccountId,
@@ -22,96 +29,266 @@ from src.domain.repositories.interfaces import (
     IMasterRepository,
 )
 
+E = TypeVar("E", bound=Enum)
+T = TypeVar("T")
+
+
+def to_enum_array(values: pd.Series, enum: type[E]) -> np.ndarray:
+    """Convert a categorical ID column to enum members, one lookup per category."""
+    codes = values.cat.codes.to_numpy()
+    if (codes < 0).any():
+        raise ValueError(f"Missing {enum.__name__} in column '{values.name}'")
+    members = np.array([enum(c) for c in values.cat.categories], dtype=object)
+    return cast(np.ndarray, members[codes])
+
+
+def to_month_index(values: pd.Series) -> np.ndarray:
+    """Convert a "YYYY-MM" column to int32 running month numbers."""
+    year = values.str.slice(0, 4).astype(np.int32)
+    month = values.str.slice(5, 7).astype(np.int32)
+    return cast(np.ndarray, (year * 12 + month - 1).to_numpy(dtype=np.int32))
+
+
+def to_enum_list(values: pd.Series, enum: type[E]) -> List[E]:
+    return cast(List[E], to_enum_array(values, enum).tolist())
+
+
+def cached(getter: Callable[..., T]) -> Callable[..., T]:
+    """Build a repository getter's result once per instance.
+
+    The datasets never change after loading, so the result is reused as-is;
+    callers must treat it as read-only.
+    """
+
+    @wraps(getter)
+    def wrapper(self: Any) -> T:
+        key = getter.__name__
+        if key not in self._cache:
+            self._cache[key] = getter(self)
+        return cast(T, self._cache[key])
+
+    return wrapper
+
+
+@dataclass(frozen=True)
+class Datasets:
+    """All input and master CSVs, parsed once and shared by the repositories.
+
+    The frames are shared, so consumers must treat them as read-only.
+    """
+
+    incomes: pd.DataFrame
+    expenses: pd.DataFrame
+    assets: pd.DataFrame
+    markets: pd.DataFrame
+    accounts: pd.DataFrame
+    payment_methods: pd.DataFrame
+
+    @classmethod
+    def load(cls, key_dir: str) -> "Datasets":
+        def read(path: str, dtype: dict[str, object]) -> pd.DataFrame:
+            # Parse only the typed columns; nothing else is consumed
+            return pd.read_csv(
+                f"{key_dir}/{path}", engine="pyarrow", usecols=list(dtype), dtype=dtype
+            )
+
+        return cls(
+            incomes=read(
+                "data/input/income.csv",
+                {"month": str, "account_id": "category", "amount": "int64"},
+            ),
+            expenses=read(
+                "data/input/expense.csv",
+                {"month": str, "method_id": "category", "amount": "int64"},
+            ),
+            assets=read(
+                "data/input/assets.csv",
+                {
+                    "month": str,
+                    "account_id": "category",
+                    "asset_class": "category",
+                    "balance": "float64",
+                },
+            ),
+            markets=read(
+                "data/input/market.csv",
+                {
+                    "month": str,
+                    "usd_jpy": "float64",
+                    "eur_jpy": "float64",
+                    "sp500": "float64",
+                },
+            ),
+            accounts=read(
+                "master/accounts.csv",
+                {
+                    "account_id": "category",
+                    "name": str,
+                    "type": "category",
+                    "currency": "category",
+                    "risk": "int64",
+                },
+            ),
+            payment_methods=read(
+                "master/payment_methods.csv",
+                {"method_id": "category", "name": str, "settlement_account": str},
+            ),
+        )
+
 
 class CsvTransactionRepository(ITransactionRepository):
-    def __init__(self, key_dir: str):
-        self.data_dir = key_dir
+    def __init__(self, datasets: Datasets):
+        self.datasets = datasets
+        self._cache: dict[str, object] = {}
+
+    def get_incomes_df(self) -> pd.DataFrame:
+        return self.datasets.incomes
+
+    def get_expenses_df(self) -> pd.DataFrame:
+        return self.datasets.expenses
 
+    @cached
     def get_incomes(self) -> List[Income]:
-        df = pd.read_csv(f"{self.data_dir}/data/input/income.csv")
+        df = self.get_incomes_df()
         return [
-            Income(
-                month=row["month"],
-                account_id=AccountId(row["account_id"]),
-                amount=row["amount"],
+            Income(month=month, account_id=account_id, amount=amount)
+            for month, account_id, amount in zip(
+                df["month"].tolist(),
+                to_enum_list(df["account_id"], AccountId),
+                df["amount"].tolist(),
             )
-            for _, row in df.iterrows()
         ]
 
+    @cached
     def get_expenses(self) -> List[Expense]:
-        df = pd.read_csv(f"{self.data_dir}/data/input/expense.csv")
+        df = self.get_expenses_df()
         return [
-            Expense(
-                month=row["month"],
-                method_id=PaymentMethodId(row["method_id"]),
-                amount=row["amount"],
+            Expense(month=month, method_id=method_id, amount=amount)
+            for month, method_id, amount in zip(
+                df["month"].tolist(),
+                to_enum_list(df["method_id"], PaymentMethodId),
+                df["amount"].tolist(),
             )
-            for _, row in df.iterrows()
         ]
 
 
 class CsvAssetRepository(IAssetRepository):
-    def __init__(self, key_dir: str):
-        self.data_dir = key_dir
+    def __init__(self, datasets: Datasets):
+        self.datasets = datasets
+        self._cache: dict[str, object] = {}
 
+    def get_assets_df(self) -> pd.DataFrame:
+        return self.datasets.assets
+
+    @cached
     def get_assets(self) -> List[Asset]:
-        df = pd.read_csv(f"{self.data_dir}/data/input/assets.csv")
+        df = self.get_assets_df()
         return [
             Asset(
-                month=row["month"],
-                account_id=AccountId(row["account_id"]),
-                asset_class=AssetClassId(row["asset_class"]),
-                balance=float(row["balance"]),
+                month=month,
+                account_id=account_id,
+                asset_class=asset_class,
+                balance=balance,
+            )
+            for month, account_id, asset_class, balance in zip(
+                df["month"].tolist(),
+                to_enum_list(df["account_id"], AccountId),
+                to_enum_list(df["asset_class"], AssetClassId),
+                df["balance"].tolist(),
             )
-            for _, row in df.iterrows()
         ]
 
+    @cached
+    def get_assets_batch(self) -> AssetBatch:
+        df = self.get_assets_df()
+        return AssetBatch(
+            month_idx=to_month_index(df["month"]),
+            account_ids=to_enum_array(df["account_id"], AccountId),
+            asset_classes=to_enum_array(df["asset_class"], AssetClassId),
+            balances=df["balance"].to_numpy(dtype=np.float64),
+        )
+
 
 class CsvMarketRepository(IMarketRepository):
-    def __init__(self, key_dir: str):
-        self.data_dir = key_dir
+    def __init__(self, datasets: Datasets):
+        self.datasets = datasets
+        self._cache: dict[str, object] = {}
 
+    @cached
     def get_market_data(self) -> List[Market]:
-        df = pd.read_csv(f"{self.data_dir}/data/input/market.csv")
+        df = self.datasets.markets
         return [
-            Market(
-                month=row["month"],
-                usd_jpy=float(row["usd_jpy"]),
-                eur_jpy=float(row["eur_jpy"]),
-                sp500=float(row["sp500"]),
+            Market(month=month, usd_jpy=usd_jpy, eur_jpy=eur_jpy, sp500=sp500)
+            for month, usd_jpy, eur_jpy, sp500 in zip(
+                df["month"].tolist(),
+                df["usd_jpy"].tolist(),
+                df["eur_jpy"].tolist(),
+                df["sp500"].tolist(),
             )
-            for _, row in df.iterrows()
         ]
 
+    @cached
+    def get_market_batch(self) -> MarketBatch:
+        df = self.datasets.markets
+        return MarketBatch(
+            month_idx=to_month_index(df["month"]),
+            usd_jpy=df["usd_jpy"].to_numpy(dtype=np.float64),
+            eur_jpy=df["eur_jpy"].to_numpy(dtype=np.float64),
+            sp500=df["sp500"].to_numpy(dtype=np.float64),
+        )
+
 
 class CsvMasterRepository(IMasterRepository):
-    def __init__(self, key_dir: str):
-        self.data_dir = key_dir
+    def __init__(self, datasets: Datasets):
+        self.datasets = datasets
+        self._cache: dict[str, object] = {}
 
+    @cached
     def get_accounts(self) -> List[Account]:
-        df = pd.read_csv(f"{self.data_dir}/master/accounts.csv")
+        df = self.datasets.accounts
         return [
             Account(
-                id=AccountId(row["account_id"]),
-                name=row["name"],
-                type=AccountType(row["type"]),
-                currency=Currency(row["currency"]),
-                risk=int(row["risk"]),
+                id=account_id,
+                name=name,
+                type=account_type,
+                currency=currency,
+                risk=int(risk),
+            )
+            for account_id, name, account_type, currency, risk in zip(
+                to_enum_list(df["account_id"], AccountId),
+                df["name"].tolist(),
+                to_enum_list(df["type"], AccountType),
+                to_enum_list(df["currency"], Currency),
+                df["risk"].tolist(),
             )
-            for _, row in df.iterrows()
         ]
 
+    @cached
+    def get_accounts_batch(self) -> AccountBatch:
+        df = self.datasets.accounts
+        return AccountBatch(
+            ids=to_enum_array(df["account_id"], AccountId),
+            types=to_enum_array(df["type"], AccountType),
+            currencies=to_enum_array(df["currency"], Currency),
+            risks=df["risk"].to_numpy(dtype=np.int64),
+        )
+
+    @cached
     def get_payment_methods(self) -> List[PaymentMethod]:
-        df = pd.read_csv(f"{self.data_dir}/master/payment_methods.csv")
+        df = self.datasets.payment_methods
         return [
             PaymentMethod(
-                id=PaymentMethodId(row["method_id"]),
-                name=row["name"],
+                id=method_id,
+                name=name,
                 settlement_account=(
-                    AccountId(row["settlement_account"])
-                    if pd.notna(row["settlement_account"])
+                    AccountId(settlement_account)
+                    if pd.notna(settlement_account)
                     else None
                 ),
             )
-            for _, row in df.iterrows()
+            for method_id, name, settlement_account in zip(
+                to_enum_list(df["method_id"], PaymentMethodId),
+                df["name"].tolist(),
+                df["settlement_account"].tolist(),
+            )
         ]
@@ -1,121 +1,103 @@
-from typing import List, Dict
-from collections import defaultdict
-from src.domain.entities.models import Asset, Market, Account, Month
+from typing import List, Dict, cast
+import numpy as np
+import pandas as pd
+from src.domain.entities.models import (
+    AssetBatch,
+    MarketBatch,
+    AccountBatch,
+    month_index,
+    month_label,
+)
 from src.constants import AccountType, Currency
 from src.use_cases.dtos.output import BalanceSheet, CashFlowStatement
 
+# Column of each currency in the per-month rate table; others convert at 1.0
+RATE_COLUMNS = {Currency.USD: 1, Currency.EUR: 2}
+# Balance sheet buckets, in the order their totals are laid out
+LIQUID, RISK, PENSION = range(3)
+
+
+def lookup_rows(keys: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Row of `keys` holding each value, or -1; the last of duplicate keys wins."""
+    last_row = {key: row for row, key in enumerate(keys.tolist())}
+    rows = np.array([*last_row.values(), -1], dtype=np.intp)
+    positions = pd.Index(list(last_row), dtype=object).get_indexer(values)
+    return cast(np.ndarray, rows[positions])
+
 
 class BalanceSheetCalculator:
     def calculate(
         self,
-        assets: List[Asset],
-        markets: List[Market],
-        accounts: List[Account],
+        assets: AssetBatch,
+        markets: MarketBatch,
+        accounts: AccountBatch,
         cashflows: List[CashFlowStatement],
     ) -> List[BalanceSheet]:
-        # Maps
-        # Account map for lookups
-        account_map: Dict[str, Account] = {acc.id: acc for acc in accounts}
-
-        # Market map by month
-        market_map: Dict[str, Market] = {m.month: m for m in markets}
-
-        # Net Savings map by month (for Investment Gain calc)
-        # We need sequential access.
-        cf_map: Dict[str, CashFlowStatement] = {cf.month: cf for cf in cashflows}
-
-        # Assets grouped by month
-        assets_by_month: Dict[str, List[Asset]] = defaultdict(list)
-        for asset in assets:
-            assets_by_month[asset.month].append(asset)
-
-        # Sort months
-        sorted_months = sorted(
-            list(set(assets_by_month.keys()) | set(market_map.keys()))
+        # Net Savings map by month index (for Investment Gain calc)
+        cf_map: Dict[int, CashFlowStatement] = {
+            month_index(cf.month): cf for cf in cashflows
+        }
+
+        # Only months with assets get a balance sheet, in month order
+        months, pos = np.unique(assets.month_idx, return_inverse=True)
+        if not len(months):
+            return []
+
+        # Exchange rates per month: [JPY, USD, EUR]
+        # Safe to assume market data exists if assets exist; otherwise 1.0
+        rates = np.ones((len(months), 3))
+        market_row = lookup_rows(markets.month_idx, months)
+        found = market_row >= 0
+        rates[found, 1] = markets.usd_jpy[market_row[found]]
+        rates[found, 2] = markets.eur_jpy[market_row[found]]
+
+        # Currency column and bucket per account
+        # Pension first, then risk assets; everything else is liquid
+        account_rate_col = np.array(
+            [RATE_COLUMNS.get(c, 0) for c in accounts.currencies.tolist()],
+            dtype=np.intp,
+        )
+        account_bucket = np.where(
+            accounts.types == AccountType.PENSION,
+            PENSION,
+            np.where(accounts.risks == 1, RISK, LIQUID),
         )
 
-        bs_list: List[BalanceSheet] = []
-        prev_total_assets = 0.0
-
-        for month in sorted_months:
-            if month not in assets_by_month:
-                continue
-
-            current_assets = assets_by_month[month]
-            market = market_map.get(month)
-            if not market:
-                # Fallback or error? For now assuming market data exists if assets exist.
-                # If simplified, maybe reuse last known?
-                # Let's raise error or use 1.0 (bad).
-                # Implementation choice: Skip calculation or assume 1.0 JPY/JPY.
-                # Safe to assume correct inputs for now.
-                pass
-
-            liquid_total = 0.0
-            risk_total = 0.0
-            pension_total = 0.0
-
-            for asset in current_assets:
-                acc = account_map.get(asset.account_id)
-                if not acc:
-                    continue  # Warn?
-
-                # Exchange Rate
-                rate = 1.0
-                if acc.currency == Currency.USD:
-                    rate = market.usd_jpy if market else 1.0
-                elif acc.currency == Currency.EUR:
-                    rate = market.eur_jpy if market else 1.0
-
-                jpy_balance = asset.balance * rate
-
-                # Classification
-                # Pension
-                if acc.type == AccountType.PENSION:
-                    pension_total += jpy_balance
-                elif acc.risk == 1:
-                    risk_total += jpy_balance
-                else:
-                    liquid_total += jpy_balance
-
-            total_assets = liquid_total + risk_total + pension_total
-
-            # Investment Gain Calculation
-            # Gain = Actual Total - (Prev Total + Net Savings)
-            # Find Net Savings for this month
-            cf = cf_map.get(month)
-            net_savings = cf.net_savings if cf else 0.0
-
-            # First month handling: Gain = 0 (or cannot calc).
-            # If prev_total_assets is 0, is it first month?
-            # We need to distinguish "Month 0" vs "Just 0 assets".
-            # Assuming strictly sequential processing.
-
-            # For the very first month in data, we can't calculate gain properly unless we have prev month data.
-            # Logic: Gain = Total - (Prev + Savings).
-            # If Prev is unknown, Gain = 0? Or Gain = Total - Savings (assuming Prev=0)?
-            # Usually Start with 0 gain.
-
-            if not bs_list:
-                # First record
-                investment_gain = 0.0
-                # BUT if we start in middle of history?
-                # The user likely has a "legacy" file or initial balance.
-                # For now: 0.
-            else:
-                investment_gain = total_assets - (prev_total_assets + net_savings)
+        # Assets of unknown accounts are skipped
+        account_row = lookup_rows(accounts.ids, assets.account_ids)
+        known = account_row >= 0
+        pos = pos[known]
+        rate_col = account_rate_col[account_row[known]]
+        bucket = account_bucket[account_row[known]]
+        jpy_balance = assets.balances[known] * rates[pos, rate_col]
+
+        # bincount adds the weights in input order, so each bucket total is
+        # summed exactly as a running per-asset total would be
+        totals = np.bincount(
+            pos * 3 + bucket, weights=jpy_balance, minlength=len(months) * 3
+        ).reshape(len(months), 3)
+        liquid_total, risk_total, pension_total = totals.T
+        total_assets = liquid_total + risk_total + pension_total
+
+        # Investment Gain Calculation
+        # Gain = Actual Total - (Prev Total + Net Savings)
+        # For the very first month in data we can't calculate gain properly,
+        # so it starts at 0.
+        net_savings = np.array(
+            [cf_map[m].net_savings if m in cf_map else 0.0 for m in months.tolist()]
+        )
+        investment_gain = np.zeros(len(months))
+        investment_gain[1:] = total_assets[1:] - (total_assets[:-1] + net_savings[1:])
 
-            bs_list.append(
-                BalanceSheet(
-                    month=Month(month),
-                    liquid_assets=int(liquid_total),
-                    risk_assets=int(risk_total),
-                    pension_assets=int(pension_total),
-                    total_financial_assets=int(total_assets),
-                    investment_gain_loss=int(investment_gain),
-                )
+        # Truncate toward zero, as int() does
+        columns = np.trunc(
+            np.stack(
+                [liquid_total, risk_total, pension_total, total_assets, investment_gain]
             )
+        ).astype(np.int64)
 
-            prev_total_assets = total_assets
-
-        return bs_list
+        # Columns follow the BalanceSheet field order
+        return [
+            BalanceSheet(month_label(month), *values)
+            for month, *values in zip(months.tolist(), *columns.tolist())
+        ]
@@ -1,38 +1,52 @@
-from typing import List, Dict
-from collections import defaultdict
+from typing import List
+import numpy as np
+import pandas as pd
 from src.domain.entities.models import Income, Expense
 from src.use_cases.dtos.output import CashFlowStatement
 
 
+def monthly_totals(months: List[str], amounts: List[int]) -> pd.Series:
+    """Sum amounts per month with one grouped reduction."""
+    series = pd.Series(amounts, index=months, dtype=np.int64)
+    return series.groupby(level=0).sum()
+
+
 class CashFlowCalculator:
     def calculate(
         self, incomes: List[Income], expenses: List[Expense]
     ) -> List[CashFlowStatement]:
-        # Aggregate by month
-        monthly_income: Dict[str, int] = defaultdict(int)
-        monthly_expense: Dict[str, int] = defaultdict(int)
-        all_months = set()
-
-        for inc in incomes:
-            monthly_income[inc.month] += inc.amount
-            all_months.add(inc.month)
-
-        for exp in expenses:
-            monthly_expense[exp.month] += exp.amount
-            all_months.add(exp.month)
+        # Aggregate by month; months missing on one side count as 0
+        monthly = (
+            pd.concat(
+                {
+                    "income": monthly_totals(
+                        [inc.month for inc in incomes], [inc.amount for inc in incomes]
+                    ),
+                    "expense": monthly_totals(
+                        [exp.month for exp in expenses],
+                        [exp.amount for exp in expenses],
+                    ),
+                },
+                axis=1,
+            )
+            .fillna(0)
+            .astype(np.int64)
+            .sort_index()
+        )
+        net_savings = monthly["income"] - monthly["expense"]
 
         # Create statements
-        statements = []
-        for month in sorted(all_months):
-            inc_val = monthly_income[month]
-            exp_val = monthly_expense[month]
-            net_savings = inc_val - exp_val
-            statement = CashFlowStatement(
+        return [
+            CashFlowStatement(
                 month=month,
                 after_tax_income=inc_val,
                 expenditure=exp_val,
-                net_savings=net_savings,
+                net_savings=net_val,
             )
-            statements.append(statement)
-
-        return statements
+            for month, inc_val, exp_val, net_val in zip(
+                monthly.index.tolist(),
+                monthly["income"].tolist(),
+                monthly["expense"].tolist(),
+                net_savings.tolist(),
+            )
+        ]
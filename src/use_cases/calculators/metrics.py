@@ -1,188 +1,157 @@
-from datetime import datetime
-from typing import List, Optional, Tuple
-from src.domain.entities.models import Market, Month
+from typing import List, cast
+import numpy as np
+from src.domain.entities.models import MarketBatch, month_index, month_label
+from src.use_cases.calculators.balance_sheet import lookup_rows
 from src.use_cases.dtos.output import BalanceSheet, CashFlowStatement, FinancialMetrics
 
 
+def safe_divide(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """Elementwise num / den as floats, 0.0 wherever den is 0."""
+    return cast(np.ndarray, np.divide(num, den, out=np.zeros(len(den)), where=den != 0))
+
+
+def trailing_geo_mean(returns: np.ndarray, window: int) -> List[float]:
+    """Geometric mean of (1 + r) over each trailing window, minus 1.
+
+    Products accumulate oldest to newest, as a running loop over the window
+    would; leading positions without a full window use what is available.
+    """
+    n = len(returns)
+    product = np.ones(n)
+    for lag in range(min(window, n) - 1, -1, -1):
+        product[lag:] *= 1 + returns[: n - lag]
+    counts = np.minimum(np.arange(1, n + 1), window)
+    # Python's pow, so the roots round exactly as the scalar formula does
+    return [p ** (1 / k) - 1 for p, k in zip(product.tolist(), counts.tolist())]
+
+
 class MetricsCalculator:
     def calculate(
         self,
         cf_statements: List[CashFlowStatement],
         bs_statements: List[BalanceSheet],
-        markets: List[Market],
+        markets: MarketBatch,
     ) -> List[FinancialMetrics]:
-        cf_map = {cf.month: cf for cf in cf_statements}
-        bs_map = {bs.month: bs for bs in bs_statements}
-        market_map = {m.month: m for m in markets}
-
-        months = sorted(
-            list(set(cf_map.keys()) | set(bs_map.keys()) | set(market_map.keys()))
-        )
-
-        # Helper to get past N months (inclusive of current)
-        def get_past_n_months_sums(
-            current_month_str: str, n: int
-        ) -> Tuple[int, int, int, int]:
-            curr_date = datetime.strptime(current_month_str, "%Y-%m")
-            curr_y = curr_date.year
-            curr_m = curr_date.month
-
-            total_gain = 0
-            total_expense = 0
-            total_income = 0
-            total_savings = 0
-
-            for i in range(n):
-                # Calculate target year/month
-                # total_months_idx = y * 12 + (m - 1)
-                month_idx = curr_y * 12 + (curr_m - 1) - i
-                y = month_idx // 12
-                m = (month_idx % 12) + 1
-
-                m_str = f"{y:04d}-{m:02d}"
-
-                bs_item = bs_map.get(m_str)
-                cf_item = cf_map.get(m_str)
-
-                if bs_item:
-                    total_gain += bs_item.investment_gain_loss
-                if cf_item:
-                    total_expense += cf_item.expenditure
-                    total_income += cf_item.after_tax_income
-                    total_savings += cf_item.net_savings
-
-            return total_gain, total_expense, total_income, total_savings
-
-        metrics_list: List[FinancialMetrics] = []
-
-        prev_bs: Optional[BalanceSheet] = None
-        prev_market: Optional[Market] = None
-
-        # Rolling windows for smoothing
-        raw_returns_window: List[float] = []
-        raw_benchmarks_window: List[float] = []
-
-        for month in months:
-            cf = cf_map.get(month)
-            bs = bs_map.get(month)
-            market = market_map.get(month)
-
-            if not cf or not bs:
-                # Need both to calc structure metrics
-                continue
-
-            # 1. Savings Rate (Trailing 12-Month)
-            # savings_rate = sum(net_savings, 12m) / sum(after_tax_income, 12m)
-            savings_rate = 0.0
-
-            # Use helpers to get TTM sums
-            # We reuse the helper, ignoring gain/expense for this call if not needed,
-            # effectively we need 12m sums for everything now.
-            _, _, sum_income_12m, sum_savings_12m = get_past_n_months_sums(month, 12)
-
-            if sum_income_12m != 0:
-                savings_rate = sum_savings_12m / sum_income_12m
-
-            # 2. Risk Asset Ratio
-            # risk_asset_ratio = (risk_assets + pension_assets) / total_financial_assets
-            risk_ratio = 0.0
-            if bs.total_financial_assets != 0:
-                risk_ratio = (
-                    bs.risk_assets + bs.pension_assets
-                ) / bs.total_financial_assets
-
-            # 3. Monthly Return (ROI) - RAW Calculation
-            # raw_monthly_return = investment_gain / prev_month_risk_assets
-            raw_monthly_return = 0.0
-            prev_risk_assets = 0
-            if prev_bs:
-                prev_risk_assets = prev_bs.risk_assets
-                if prev_risk_assets > 0:
-                    raw_monthly_return = bs.investment_gain_loss / prev_risk_assets
-
-            # 4. Benchmark Return - RAW Calculation
-            # Benchmark Return = (JPY_SP500_M / JPY_SP500_M-1) - 1
-            raw_benchmark_return = 0.0
-
-            if market and prev_market:
-                # Calculate JPY denominated SP500 for both months
-                current_sp500_jpy = market.sp500 * market.usd_jpy
-                prev_sp500_jpy = prev_market.sp500 * prev_market.usd_jpy
-
-                if prev_sp500_jpy > 0:
-                    raw_benchmark_return = (current_sp500_jpy / prev_sp500_jpy) - 1
-
-            # Update Rolling Windows
-            raw_returns_window.append(raw_monthly_return)
-            raw_benchmarks_window.append(raw_benchmark_return)
-
-            # Keep only last 12
-            if len(raw_returns_window) > 12:
-                raw_returns_window.pop(0)
-            if len(raw_benchmarks_window) > 12:
-                raw_benchmarks_window.pop(0)
-
-            # Calculate Geometric Mean Return
-            # Formula: (Product(1 + r))^(1/n) - 1
-            geo_monthly_return = 0.0
-            if raw_returns_window:
-                product_ret = 1.0
-                for r in raw_returns_window:
-                    product_ret *= 1 + r
-                geo_monthly_return = (product_ret ** (1 / len(raw_returns_window))) - 1
-
-            geo_benchmark_return = 0.0
-            if raw_benchmarks_window:
-                product_bench = 1.0
-                for r in raw_benchmarks_window:
-                    product_bench *= 1 + r
-                geo_benchmark_return = (
-                    product_bench ** (1 / len(raw_benchmarks_window))
-                ) - 1
-
-            # Alpha based on Geo Returns
-            geo_monthly_alpha = geo_monthly_return - geo_benchmark_return
-
-            # 5. FI Ratios
-            # Trailing 12-Month FI Ratio
-            gain_12m, xp_12m, _, _ = get_past_n_months_sums(month, 12)
-            fi_ratio_12m = 0.0
-            if xp_12m != 0:
-                fi_ratio_12m = gain_12m / xp_12m
-
-            # Trailing 48-Month FI Ratio
-            gain_48m, xp_48m, _, _ = get_past_n_months_sums(month, 48)
-            fi_ratio_48m = 0.0
-            if xp_48m != 0:
-                fi_ratio_48m = gain_48m / xp_48m
-
-            # Forward 12-Month FI Ratio (Projected)
-            # fi_ratio_next_12m = (risk_assets * expected_annual_return) / projected_annual_expenses
-            # projected_annual_expenses = trailing 12-month expenses (xp_12m)
-            expected_annual_return = 0.05  # Assumption: 5% annual return
-            fi_ratio_next_12m = 0.0
-            if xp_12m != 0:
-                fi_ratio_next_12m = (bs.risk_assets * expected_annual_return) / xp_12m
-
-            metrics_list.append(
-                FinancialMetrics(
-                    month=Month(month),
-                    savings_rate=savings_rate,
-                    risk_asset_ratio=risk_ratio,
-                    monthly_return=geo_monthly_return,
-                    monthly_alpha=geo_monthly_alpha,
-                    benchmark_return=geo_benchmark_return,
-                    fi_ratio_12m=fi_ratio_12m,
-                    fi_ratio_48m=fi_ratio_48m,
-                    fi_ratio_next_12m=fi_ratio_next_12m,
+        # Statements are unique per month; lay them out as arrays keyed by
+        # running month index (see month_index)
+        cf_idx = np.array([month_index(cf.month) for cf in cf_statements], dtype=int)
+        bs_idx = np.array([month_index(bs.month) for bs in bs_statements], dtype=int)
+        cf_rows = np.array(
+            [
+                (cf.expenditure, cf.after_tax_income, cf.net_savings)
+                for cf in cf_statements
+            ],
+            dtype=np.int64,
+        ).reshape(len(cf_statements), 3)
+        bs_rows = np.array(
+            [
+                (
+                    bs.risk_assets,
+                    bs.pension_assets,
+                    bs.total_financial_assets,
+                    bs.investment_gain_loss,
                 )
+                for bs in bs_statements
+            ],
+            dtype=np.int64,
+        ).reshape(len(bs_statements), 4)
+
+        # Need both CF and BS to calc structure metrics; every series below
+        # is aligned on these (sorted) months
+        valid_months, _, bs_pos = np.intersect1d(
+            cf_idx, bs_idx, assume_unique=True, return_indices=True
+        )
+        if not len(valid_months):
+            return []
+
+        # Flows only exist in CF/BS months, so market months never widen the
+        # month axis
+        first_idx = min(cf_idx.min(), bs_idx.min())
+        span = max(cf_idx.max(), bs_idx.max()) - first_idx + 1
+
+        # Prefix sums of gain, expense, income and savings over every calendar
+        # month from the first one, so months missing from the data count as 0
+        # and each trailing window is a single subtraction.
+        # Column 0 is the empty prefix; month first_idx + i sits at column i + 1.
+        flows = np.zeros((4, span + 1), dtype=np.int64)
+        flows[0, bs_idx - first_idx + 1] = bs_rows[:, 3]
+        flows[1:, cf_idx - first_idx + 1] = cf_rows.T
+        prefix = flows.cumsum(axis=1)
+
+        # Trailing N-month (inclusive of current) sums per valid month
+        ends = valid_months - first_idx + 1
+        gain_12m, xp_12m, income_12m, savings_12m = (
+            prefix[:, ends] - prefix[:, np.maximum(ends - 12, 0)]
+        )
+        gain_48m, xp_48m, _, _ = prefix[:, ends] - prefix[:, np.maximum(ends - 48, 0)]
+
+        risk, pension, total, gain = bs_rows[bs_pos].T
+
+        # 1. Savings Rate (Trailing 12-Month)
+        # savings_rate = sum(net_savings, 12m) / sum(after_tax_income, 12m)
+        savings_rate = safe_divide(savings_12m, income_12m)
+
+        # 2. Risk Asset Ratio
+        # risk_asset_ratio = (risk_assets + pension_assets) / total_financial_assets
+        risk_ratio = safe_divide(risk + pension, total)
+
+        # 3. Monthly Return (ROI) - RAW Calculation
+        # raw_monthly_return = investment_gain / prev_month_risk_assets
+        # The previous month is the previous valid month; the first has none.
+        prev_risk = np.concatenate(([0], risk[:-1]))
+        raw_monthly_return = safe_divide(gain, np.where(prev_risk > 0, prev_risk, 0))
+
+        # 4. Benchmark Return - RAW Calculation
+        # Benchmark Return = (JPY_SP500_M / JPY_SP500_M-1) - 1
+        # The previous market is the latest earlier valid month with market data.
+        # The last of duplicate market months wins
+        rows = lookup_rows(markets.month_idx, valid_months)
+        has_market = rows >= 0
+        # A trailing 0.0 stands in for months without market data (row -1)
+        sp500_jpy = np.append(markets.sp500 * markets.usd_jpy, 0.0)[rows]
+        positions = np.arange(len(valid_months))
+        last_market = np.maximum.accumulate(np.where(has_market, positions, -1))
+        prev_market = np.concatenate(([-1], last_market[:-1]))
+        prev_sp500_jpy = np.where(prev_market >= 0, sp500_jpy[prev_market], 0.0)
+        comparable = has_market & (prev_sp500_jpy > 0)
+        raw_benchmark_return = safe_divide(
+            sp500_jpy, np.where(comparable, prev_sp500_jpy, 0.0)
+        )
+        raw_benchmark_return[comparable] -= 1
+
+        # Geometric Mean Returns over rolling 12-month windows for smoothing
+        # Formula: (Product(1 + r))^(1/n) - 1
+        geo_monthly_return = trailing_geo_mean(raw_monthly_return, 12)
+        geo_benchmark_return = trailing_geo_mean(raw_benchmark_return, 12)
+
+        # Alpha based on Geo Returns
+        geo_monthly_alpha = [
+            r - b for r, b in zip(geo_monthly_return, geo_benchmark_return)
+        ]
+
+        # 5. FI Ratios
+        # Trailing 12-Month and 48-Month FI Ratios
+        fi_ratio_12m = safe_divide(gain_12m, xp_12m)
+        fi_ratio_48m = safe_divide(gain_48m, xp_48m)
+
+        # Forward 12-Month FI Ratio (Projected)
+        # fi_ratio_next_12m = (risk_assets * expected_annual_return) / projected_annual_expenses
+        # projected_annual_expenses = trailing 12-month expenses (xp_12m)
+        expected_annual_return = 0.05  # Assumption: 5% annual return
+        fi_ratio_next_12m = safe_divide(risk * expected_annual_return, xp_12m)
+
+        # Columns follow the FinancialMetrics field order
+        return [
+            FinancialMetrics(month_label(month), *values)
+            for month, *values in zip(
+                valid_months.tolist(),
+                savings_rate.tolist(),
+                risk_ratio.tolist(),
+                geo_monthly_return,
+                geo_monthly_alpha,
+                geo_benchmark_return,
+                fi_ratio_12m.tolist(),
+                fi_ratio_48m.tolist(),
+                fi_ratio_next_12m.tolist(),
             )
-
-            # Update history for next iteration
-            # We ONLY update if we had valid BS/Market for this month
-            if bs:
-                prev_bs = bs
-            if market:
-                prev_market = market
-
-        return metrics_list
+        ]
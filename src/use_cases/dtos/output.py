@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from src.domain.entities.models import Month
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CashFlowStatement:
     month: Month
     after_tax_income: int
@@ -10,7 +10,7 @@ class CashFlowStatement:
     net_savings: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BalanceSheet:
     month: Month
     liquid_assets: int
@@ -20,7 +20,7 @@ class BalanceSheet:
     investment_gain_loss: int
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FinancialMetrics:
     month: Month
     savings_rate: float
@@ -1,11 +1,383 @@
 """Graph generation service for financial data visualization."""
 
 import os
+import uuid
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional, cast
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
+from plotly.io.json import to_json_plotly
+from plotly.offline import get_plotlyjs_version
+
+from src.domain.entities.models import month_index
+
+# Chart data as one array per CSV column (month strings and float64 values)
+Columns = dict[str, np.ndarray]
+
+# Columns the charts plot, per calculated CSV; all are parsed as float64
+CHART_COLUMNS: dict[str, tuple[str, ...]] = {
+    "forecast.csv": (
+        "liquid_assets",
+        "risk_assets",
+        "pension_assets",
+        "after_tax_income",
+        "expenditure",
+        "net_savings",
+        "investment_gain_loss",
+        "savings_rate",
+        "risk_asset_ratio",
+        "monthly_return",
+        "benchmark_return",
+        "monthly_alpha",
+        "fi_ratio_12m",
+        "fi_ratio_48m",
+        "fi_ratio_next_12m",
+    ),
+}
+
+# Ratio columns charted in percent; the cache keeps each as '<column>_pct' too
+PERCENT_COLUMNS = (
+    "savings_rate",
+    "risk_asset_ratio",
+    "monthly_return",
+    "benchmark_return",
+    "monthly_alpha",
+)
+
+
+# plotly.js build matching the installed plotly; pages load it once, and the
+# chart fragments only call into it
+PLOTLY_JS_URL = f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"
+
+# Fragments take their layout from the page's CHART_LAYOUTS (see
+# CHART_LAYOUTS_JS), copied since newPlot keeps and mutates the object
+FIGURE_HTML = (
+    '<div id="{id}" class="plotly-graph-div" style="height:100%; width:100%;">'
+    "</div>"
+    '<script type="text/javascript">'
+    'Plotly.newPlot("{id}", {data}, structuredClone(CHART_LAYOUTS["{chart}"]),'
+    ' {{"responsive": true}});'
+    "</script>"
+)
+
+
+# Charts GraphService renders, by the name in each get_<name>_chart method
+# (built by _<name>_chart from the range's columns)
+CHART_NAMES = ("net_worth", "cashflow", "allocation", "ratios", "returns", "fi")
+
+# Longest series a chart plots; longer ranges are downsampled (see downsample)
+MAX_CHART_POINTS = 1000
+
+
+@lru_cache(maxsize=8)
+def _read_columns_cached(path: str, mtime_ns: int, columns: tuple[str, ...]) -> Columns:
+    """Read a CSV or Parquet file once per version; the mtime keys the cache.
+
+    Shared by every GraphService in the process, so repeated chart requests
+    do not re-read the file. Only 'month' and `columns` are read (CSVs with
+    the PyArrow parser and no type inference), and each column is kept as a
+    read-only array. Rows are ordered by month, and 'month_idx' holds each
+    month's running month number for range lookups. PERCENT_COLUMNS among
+    `columns` are also scaled to percent once here, as '<column>_pct', and
+    'expenditure' is negated as 'expenditure_neg'.
+    """
+    dtype: dict[str, object] = {"month": str}
+    dtype.update(dict.fromkeys(columns, "float64"))
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path, engine="pyarrow", columns=list(dtype))
+    else:
+        df = pd.read_csv(path, engine="pyarrow", usecols=list(dtype), dtype=dtype)
+    month = df["month"].to_numpy(dtype=object)
+    month_idx = np.array([month_index(m) for m in month], dtype=np.int32)
+    # Files are written in month order; sort only if one is not
+    order: slice | np.ndarray = slice(None)
+    if (np.diff(month_idx) < 0).any():
+        order = np.argsort(month_idx, kind="stable")
+    data: Columns = {"month": month[order], "month_idx": month_idx[order]}
+    data.update((col, df[col].to_numpy(dtype=np.float64)[order]) for col in columns)
+    data.update(
+        (f"{col}_pct", data[col] * 100) for col in PERCENT_COLUMNS if col in data
+    )
+    if "expenditure" in data:
+        # Expenses are charted below the axis
+        data["expenditure_neg"] = -data["expenditure"]
+    for values in data.values():
+        values.flags.writeable = False
+    return data
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over up to `window` values (shorter at the start).
+
+    Matches rolling(window, min_periods=1).mean(): NaNs are skipped, and a
+    window with no values is NaN. Window sums come from prefix sums.
+    """
+    valid = ~np.isnan(values)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(valid)))
+    starts = np.maximum(np.arange(1, len(values) + 1) - window, 0)
+    window_counts = counts[1:] - counts[starts]
+    averages = np.divide(
+        sums[1:] - sums[starts],
+        window_counts,
+        out=np.full(len(values), np.nan),
+        where=window_counts > 0,
+    )
+    return cast(np.ndarray, averages)
+
+
+def lttb_indices(values: np.ndarray, n_out: int) -> np.ndarray:
+    """Positions of the n_out points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last points are always kept. The points between them are
+    split into n_out - 2 buckets, and each bucket keeps the point forming the
+    largest triangle with the previously kept point and the mean of the next
+    bucket. NaNs count as 0 for the selection.
+    """
+    n = len(values)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    y = np.nan_to_num(values)
+    # n_out - 2 buckets over positions 1 .. n - 2, then the last point
+    every = (n - 2) / (n_out - 2)
+    edges = np.append((np.arange(n_out - 1) * every).astype(np.intp) + 1, n)
+    keep = np.empty(n_out, dtype=np.intp)
+    keep[0], keep[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi, next_hi = edges[i], edges[i + 1], edges[i + 2]
+        next_x = (hi + next_hi - 1) / 2
+        next_y = y[hi:next_hi].mean()
+        x = np.arange(lo, hi)
+        area = np.abs(
+            (prev - next_x) * (y[lo:hi] - y[prev]) - (prev - x) * (next_y - y[prev])
+        )
+        prev = keep[i + 1] = lo + area.argmax()
+    return keep
+
+
+def downsample(
+    data: Columns, values: np.ndarray, max_points: int = MAX_CHART_POINTS
+) -> Columns:
+    """Thin every column to at most max_points rows, chosen by LTTB on values.
+
+    Columns keep the same rows, so traces in one chart still share their
+    x values. Ranges within max_points are returned unchanged.
+    """
+    if len(values) <= max_points:
+        return data
+    keep = lttb_indices(values, max_points)
+    return {col: column[keep] for col, column in data.items()}
+
+
+# Style of each chart series, as raw trace dicts; see trace
+TRACE_STYLES: dict[str, dict[str, object]] = {
+    # Asset buckets (net worth and allocation)
+    "liquid_assets": dict(
+        type="bar", name="Liquid Assets", marker=dict(color="rgba(59, 130, 246, 0.8)")
+    ),
+    "risk_assets": dict(
+        type="bar", name="Risk Assets", marker=dict(color="rgba(16, 185, 129, 0.8)")
+    ),
+    "pension_assets": dict(
+        type="bar",
+        name="Pension Assets",
+        marker=dict(color="rgba(139, 92, 246, 0.8)"),
+    ),
+    # Cash flow
+    "income": dict(
+        type="bar", name="Income", marker=dict(color="rgba(16, 185, 129, 0.8)")
+    ),
+    "income_12ma": dict(
+        type="scatter",
+        name="Income (12MA)",
+        mode="lines",
+        line=dict(color="rgba(16, 185, 129, 1)", width=3, dash="dash"),
+    ),
+    "expenses": dict(
+        type="bar", name="Expenses", marker=dict(color="rgba(239, 68, 68, 0.8)")
+    ),
+    "investment_gain_loss": dict(
+        type="bar",
+        name="Investment G/L",
+        marker=dict(color="rgba(139, 92, 246, 0.8)"),
+    ),
+    "total_flow": dict(
+        type="scatter",
+        name="Total Flow",
+        mode="lines+markers",
+        line=dict(color="rgba(59, 130, 246, 1)", width=2),
+        marker=dict(size=6),
+    ),
+    "total_flow_12ma": dict(
+        type="scatter",
+        name="Total Flow (12MA)",
+        mode="lines",
+        line=dict(color="rgba(245, 158, 11, 1)", width=3, dash="dash"),
+    ),
+    # Ratios
+    "savings_rate": dict(
+        type="scatter",
+        name="Savings Rate (%)",
+        mode="lines+markers",
+        line=dict(color="rgba(59, 130, 246, 1)", width=2),
+    ),
+    "risk_asset_ratio": dict(
+        type="scatter",
+        name="Risk Asset Ratio (%)",
+        mode="lines+markers",
+        line=dict(color="rgba(16, 185, 129, 1)", width=2),
+    ),
+    # Returns
+    "monthly_return": dict(
+        type="scatter",
+        name="Monthly Return (%)",
+        mode="lines+markers",
+        line=dict(color="rgba(59, 130, 246, 1)", width=2),
+    ),
+    "benchmark_return": dict(
+        type="scatter",
+        name="Benchmark Return (%)",
+        mode="lines+markers",
+        line=dict(color="rgba(148, 163, 184, 1)", width=2, dash="dot"),
+    ),
+    "monthly_alpha": dict(
+        type="scatter",
+        name="Alpha (%)",
+        mode="lines+markers",
+        line=dict(color="rgba(139, 92, 246, 1)", width=2),
+    ),
+    # Financial independence
+    "fi_ratio_12m": dict(
+        type="scatter",
+        name="FI Ratio (12m)",
+        mode="lines+markers",
+        line=dict(color="rgba(59, 130, 246, 1)", width=2),
+    ),
+    "fi_ratio_48m": dict(
+        type="scatter",
+        name="FI Ratio (48m)",
+        mode="lines+markers",
+        line=dict(color="rgba(16, 185, 129, 1)", width=2),
+    ),
+    "fi_ratio_next_12m": dict(
+        type="scatter",
+        name="FI Ratio (Proj)",
+        mode="lines+markers",
+        line=dict(color="rgba(245, 158, 11, 1)", width=2, dash="dot"),
+    ),
+}
+
+
+def trace(style: str, x: np.ndarray, y: np.ndarray) -> dict[str, object]:
+    """A raw trace dict: the TRACE_STYLES entry plus its data.
+
+    go.Figure takes these directly, which skips building a go.Bar or
+    go.Scatter wrapper per series.
+    """
+    return {**TRACE_STYLES[style], "x": x, "y": y}
+
+
+# Layout settings every chart shares; chart_layout adds the per-chart parts
+BASE_LAYOUT: dict[str, object] = dict(
+    hovermode="x unified",
+    template="plotly_white",
+    margin=dict(l=40, r=40, t=100, b=40),
+    legend=dict(orientation="h", yanchor="bottom", y=1.05, xanchor="right", x=1),
+)
+
+
+def chart_layout(title: str, **layout: object) -> dict[str, object]:
+    """BASE_LAYOUT with a centered title and the chart's own settings."""
+    title_layout = dict(text=title, y=0.98, x=0.5, xanchor="center")
+    return {**BASE_LAYOUT, "title": title_layout, **layout}
+
+
+def layout_json(title: str, **layout: object) -> str:
+    """chart_layout validated as a go.Layout and serialized to JSON."""
+    layout_dict = go.Layout(chart_layout(title, **layout)).to_plotly_json()
+    return cast(str, to_json_plotly(layout_dict))
+
+
+# Chart layouts are static, so each is validated (with its template) and
+# serialized once, at import, instead of on every request
+CHART_LAYOUTS: dict[str, str] = {
+    "net_worth": layout_json(
+        "Net Worth Trend (万円)",
+        xaxis_title="Month",
+        yaxis_title="Amount (万円)",
+        barmode="stack",
+    ),
+    "cashflow": layout_json(
+        "Monthly Cash Flow (万円)",
+        xaxis_title="Month",
+        yaxis_title="Amount (万円)",
+        barmode="relative",
+    ),
+    "allocation": layout_json(
+        "Asset Allocation (%)",
+        xaxis_title="Month",
+        yaxis_title="Ratio (%)",
+        barmode="stack",
+        yaxis=dict(range=[0, 100]),
+    ),
+    "ratios": layout_json(
+        "Financial Ratios (%)",
+        yaxis=dict(title="Ratio (%)"),
+    ),
+    "returns": layout_json(
+        "Investment Performance (%)",
+        yaxis=dict(title="Return (%)"),
+    ),
+    "fi": layout_json(
+        "Financial Independence Ratio (Years Covered)",
+        yaxis=dict(title="Ratio (x Expenses)"),
+        shapes=[
+            dict(
+                type="line",
+                yref="y",
+                y0=1.0,
+                y1=1.0,
+                xref="paper",
+                x0=0,
+                x1=1,
+                line=dict(
+                    color="rgba(239, 68, 68, 0.5)",
+                    width=2,
+                    dash="dashdot",
+                ),
+                name="FIRE Target (100%)",
+            )
+        ],
+    ),
+}
+
+# CHART_LAYOUTS as one JavaScript object literal. Pages define it once, so
+# chart fragments carry only their trace data, not the layout and template.
+CHART_LAYOUTS_JS = (
+    "{" + ",".join(f'"{name}":{layout}' for name, layout in CHART_LAYOUTS.items()) + "}"
+)
+
+
+def figure_html(traces: list[dict[str, object]], chart: str) -> str:
+    """Render a chart's traces as an HTML fragment using its page layout.
+
+    The fragment is a bare newPlot call on the page's plotly.js and its
+    CHART_LAYOUTS entry, without to_html's page template or per-fragment
+    plotly.js script tag. Traces are validated by a template-less go.Figure
+    (the layout carries the template), and to_json_plotly encodes their
+    numpy arrays directly, with orjson when it is installed (the 'fast'
+    extra).
+    """
+    fig = go.Figure(data=traces, layout=dict(template={}))
+    return FIGURE_HTML.format(
+        id=uuid.uuid4(),
+        data=to_json_plotly(fig.to_plotly_json()["data"]),
+        chart=chart,
+    )
 
 
 @dataclass
@@ -14,366 +386,172 @@ class GraphService:
 
     data_dir: str
 
-    def _load_csv(self, filename: str) -> pd.DataFrame:
-        path = os.path.join(self.data_dir, "data", "calculated", filename)
-        return pd.read_csv(path)
+    def __post_init__(self) -> None:
+        # Warm the cache so the first chart request does not pay for parsing;
+        # _load_columns still reloads whenever a file changes
+        for filename in CHART_COLUMNS:
+            if os.path.exists(self._csv_path(filename)):
+                self._load_columns(filename)
+
+    def _csv_path(self, filename: str) -> str:
+        return os.path.join(self.data_dir, "data", "calculated", filename)
+
+    def _load_columns(self, filename: str) -> Columns:
+        path = self._csv_path(filename)
+        mtime_ns = os.stat(path).st_mtime_ns
+        # Prefer the Parquet copy the pipeline writes next to the CSV, unless
+        # the CSV has been written since
+        parquet_path = os.path.splitext(path)[0] + ".parquet"
+        if os.path.exists(parquet_path):
+            parquet_mtime_ns = os.stat(parquet_path).st_mtime_ns
+            if parquet_mtime_ns >= mtime_ns:
+                path, mtime_ns = parquet_path, parquet_mtime_ns
+        return _read_columns_cached(path, mtime_ns, CHART_COLUMNS[filename])
 
     def _filter_data(
-        self, df: pd.DataFrame, months: Optional[int], forecast: Optional[int]
-    ) -> pd.DataFrame:
-        current = "2025-12"
+        self, data: Columns, months: Optional[int], forecast: Optional[int]
+    ) -> Columns:
+        current = month_index("2025-12")
+        month_idx = data["month_idx"]
+        # Months are sorted, so each range is a slice found by binary search
         if forecast:
-            start = (pd.to_datetime(current) - pd.DateOffset(months=12)).strftime("%Y-%m")
-            end = (pd.to_datetime(current) + pd.DateOffset(months=forecast)).strftime("%Y-%m")
-            return df[(df["month"] >= start) & (df["month"] <= end)]
-        if months:
-            return df[df["month"] <= current].tail(months)
-        return df[df["month"] <= current]
+            start = int(np.searchsorted(month_idx, current - 12))
+            end = int(np.searchsorted(month_idx, current + forecast, side="right"))
+        else:
+            end = int(np.searchsorted(month_idx, current, side="right"))
+            start = max(end - months, 0) if months else 0
+        return {col: values[start:end] for col, values in data.items()}
+
+    def _chart_data(self, months: Optional[int], forecast: Optional[int]) -> Columns:
+        return self._filter_data(self._load_columns("forecast.csv"), months, forecast)
 
     def get_net_worth_chart(self, months: Optional[int] = None, forecast: Optional[int] = None) -> str:
         """Generate stacked bar chart for net worth trend."""
-        df = self._load_csv("forecast.csv")
-        df = self._filter_data(df, months, forecast)
-
-        fig = go.Figure()
+        return self._net_worth_chart(self._chart_data(months, forecast))
 
-        fig.add_trace(
-            go.Bar(
-                x=df["month"],
-                y=df["liquid_assets"],
-                name="Liquid Assets",
-                marker_color="rgba(59, 130, 246, 0.8)",
-            )
+    def _net_worth_chart(self, data: Columns) -> str:
+        data = downsample(
+            data, data["liquid_assets"] + data["risk_assets"] + data["pension_assets"]
         )
 
-        fig.add_trace(
-            go.Bar(
-                x=df["month"],
-                y=df["risk_assets"],
-                name="Risk Assets",
-                marker_color="rgba(16, 185, 129, 0.8)",
-            )
-        )
+        month = data["month"]
+        traces = [
+            trace("liquid_assets", month, data["liquid_assets"]),
+            trace("risk_assets", month, data["risk_assets"]),
+            trace("pension_assets", month, data["pension_assets"]),
+        ]
 
-        fig.add_trace(
-            go.Bar(
-                x=df["month"],
-                y=df["pension_assets"],
-                name="Pension Assets",
-                marker_color="rgba(139, 92, 246, 0.8)",
-            )
-        )
-
-        fig.update_layout(
-            title=dict(text="Net Worth Trend (万円)", y=0.98, x=0.5, xanchor="center"),
-            xaxis_title="Month",
-            yaxis_title="Amount (万円)",
-            barmode="stack",
-            hovermode="x unified",
-            template="plotly_white",
-            margin=dict(l=40, r=40, t=100, b=40),
-            legend=dict(
-                orientation="h", yanchor="bottom", y=1.05, xanchor="right", x=1
-            ),
-        )
-
-        return cast(str, fig.to_html(full_html=False, include_plotlyjs="cdn"))
+        return figure_html(traces, "net_worth")
 
     def get_cashflow_chart(self, months: Optional[int] = None, forecast: Optional[int] = None) -> str:
         """Generate bar chart for monthly cash flow."""
-        df = self._load_csv("forecast.csv")
-        df = self._filter_data(df, months, forecast)
-
-        income_12ma = df["after_tax_income"].rolling(window=12, min_periods=1).mean()
-
-        fig = go.Figure()
-
-        fig.add_trace(
-            go.Bar(
-                x=df["month"],
-                y=df["after_tax_income"],
-                name="Income",
-                marker_color="rgba(16, 185, 129, 0.8)",
-            )
-        )
-
-        fig.add_trace(
-            go.Scatter(
-                x=df["month"],
-                y=income_12ma,
-                name="Income (12MA)",
-                mode="lines",
-                line=dict(color="rgba(16, 185, 129, 1)", width=3, dash="dash"),
-            )
+        return self._cashflow_chart(self._chart_data(months, forecast))
+
+    def _cashflow_chart(self, data: Columns) -> str:
+        income_12ma = moving_average(data["after_tax_income"], 12)
+
+        total_flow = data["net_savings"] + data["investment_gain_loss"]
+        total_flow_12ma = moving_average(total_flow, 12)
+        data = downsample(
+            {
+                **data,
+                "income_12ma": income_12ma,
+                "total_flow": total_flow,
+                "total_flow_12ma": total_flow_12ma,
+            },
+            total_flow,
         )
 
-        fig.add_trace(
-            go.Bar(
-                x=df["month"],
-                y=-df["expenditure"],
-                name="Expenses",
-                marker_color="rgba(239, 68, 68, 0.8)",
-            )
-        )
-
-        fig.add_trace(
-            go.Bar(
-                x=df["month"],
-                y=df["investment_gain_loss"],
-                name="Investment G/L",
-                marker_color="rgba(139, 92, 246, 0.8)",
-            )
-        )
-
-        total_flow = df["net_savings"] + df["investment_gain_loss"]
-        total_flow_12ma = total_flow.rolling(window=12, min_periods=1).mean()
-
-        fig.add_trace(
-            go.Scatter(
-                x=df["month"],
-                y=total_flow,
-                name="Total Flow",
-                mode="lines+markers",
-                line=dict(color="rgba(59, 130, 246, 1)", width=2),
-                marker=dict(size=6),
-            )
-        )
-
-        fig.add_trace(
-            go.Scatter(
-                x=df["month"],
-                y=total_flow_12ma,
-                name="Total Flow (12MA)",
-                mode="lines",
-                line=dict(color="rgba(245, 158, 11, 1)", width=3, dash="dash"),
-            )
-        )
+        month = data["month"]
+        traces = [
+            trace("income", month, data["after_tax_income"]),
+            trace("income_12ma", month, data["income_12ma"]),
+            trace("expenses", month, data["expenditure_neg"]),
+            trace("investment_gain_loss", month, data["investment_gain_loss"]),
+            trace("total_flow", month, data["total_flow"]),
+            trace("total_flow_12ma", month, data["total_flow_12ma"]),
+        ]
 
-
-        fig.update_layout(
-            title=dict(text="Monthly Cash Flow (万円)", y=0.98, x=0.5, xanchor="center"),
-            xaxis_title="Month",
-            yaxis_title="Amount (万円)",
-            barmode="relative",
-            hovermode="x unified",
-            template="plotly_white",
-            margin=dict(l=40, r=40, t=100, b=40),
-            legend=dict(
-                orientation="h", yanchor="bottom", y=1.05, xanchor="right", x=1
-            ),
-        )
-
-        return cast(str, fig.to_html(full_html=False, include_plotlyjs="cdn"))
+        return figure_html(traces, "cashflow")
 
     def get_allocation_chart(self, months: Optional[int] = None, forecast: Optional[int] = None) -> str:
         """Generate 100% stacked bar chart for asset allocation trend."""
-        df = self._load_csv("forecast.csv")
-        df = self._filter_data(df, months, forecast)
-
-        # Calculate percentages
-        total = df["liquid_assets"] + df["risk_assets"] + df["pension_assets"]
-        liquid_pct = df["liquid_assets"] / total * 100
-        risk_pct = df["risk_assets"] / total * 100
-        pension_pct = df["pension_assets"] / total * 100
-
-        fig = go.Figure()
-
-        fig.add_trace(
-            go.Bar(
-                x=df["month"],
-                y=liquid_pct,
-                name="Liquid Assets",
-                marker_color="rgba(59, 130, 246, 0.8)",
-            )
-        )
+        return self._allocation_chart(self._chart_data(months, forecast))
 
-        fig.add_trace(
-            go.Bar(
-                x=df["month"],
-                y=risk_pct,
-                name="Risk Assets",
-                marker_color="rgba(16, 185, 129, 0.8)",
-            )
+    def _allocation_chart(self, data: Columns) -> str:
+        data = downsample(
+            data, data["liquid_assets"] + data["risk_assets"] + data["pension_assets"]
         )
 
-        fig.add_trace(
-            go.Bar(
-                x=df["month"],
-                y=pension_pct,
-                name="Pension Assets",
-                marker_color="rgba(139, 92, 246, 0.8)",
-            )
+        # Calculate percentages in one (3, N) block; rows sum in the order
+        # liquid + risk + pension, as the total did
+        assets = np.stack(
+            (data["liquid_assets"], data["risk_assets"], data["pension_assets"])
         )
+        liquid_pct, risk_pct, pension_pct = assets / assets.sum(axis=0) * 100
 
-        fig.update_layout(
-            title=dict(text="Asset Allocation (%)", y=0.98, x=0.5, xanchor="center"),
-            xaxis_title="Month",
-            yaxis_title="Ratio (%)",
-            barmode="stack",
-            hovermode="x unified",
-            template="plotly_white",
-            margin=dict(l=40, r=40, t=100, b=40),
-            legend=dict(
-                orientation="h", yanchor="bottom", y=1.05, xanchor="right", x=1
-            ),
-            yaxis=dict(range=[0, 100]),
-        )
+        month = data["month"]
+        traces = [
+            trace("liquid_assets", month, liquid_pct),
+            trace("risk_assets", month, risk_pct),
+            trace("pension_assets", month, pension_pct),
+        ]
 
-        return cast(str, fig.to_html(full_html=False, include_plotlyjs="cdn"))
+        return figure_html(traces, "allocation")
 
     def get_ratios_chart(self, months: Optional[int] = None, forecast: Optional[int] = None) -> str:
         """Generate line chart for savings rate and risk asset ratio."""
-        df = self._load_csv("forecast.csv")
-        df = self._filter_data(df, months, forecast)
-
-        fig = go.Figure()
-
-        fig.add_trace(
-            go.Scatter(
-                x=df["month"],
-                y=df["savings_rate"] * 100,
-                name="Savings Rate (%)",
-                mode="lines+markers",
-                line=dict(color="rgba(59, 130, 246, 1)", width=2),
-            )
-        )
+        return self._ratios_chart(self._chart_data(months, forecast))
 
-        fig.add_trace(
-            go.Scatter(
-                x=df["month"],
-                y=df["risk_asset_ratio"] * 100,
-                name="Risk Asset Ratio (%)",
-                mode="lines+markers",
-                line=dict(color="rgba(16, 185, 129, 1)", width=2),
-            )
-        )
+    def _ratios_chart(self, data: Columns) -> str:
+        data = downsample(data, data["savings_rate"])
 
-        fig.update_layout(
-            title=dict(text="Financial Ratios (%)", y=0.98, x=0.5, xanchor="center"),
-            hovermode="x unified",
-            template="plotly_white",
-            margin=dict(l=40, r=40, t=100, b=40),
-            legend=dict(
-                orientation="h", yanchor="bottom", y=1.05, xanchor="right", x=1
-            ),
-            yaxis=dict(title="Ratio (%)"),
-        )
+        month = data["month"]
+        traces = [
+            trace("savings_rate", month, data["savings_rate_pct"]),
+            trace("risk_asset_ratio", month, data["risk_asset_ratio_pct"]),
+        ]
 
-        return cast(str, fig.to_html(full_html=False, include_plotlyjs="cdn"))
+        return figure_html(traces, "ratios")
 
     def get_returns_chart(self, months: Optional[int] = None, forecast: Optional[int] = None) -> str:
         """Generate line chart for investment returns."""
-        df = self._load_csv("forecast.csv")
-        df = self._filter_data(df, months, forecast)
-
-        fig = go.Figure()
-
-        fig.add_trace(
-            go.Scatter(
-                x=df["month"],
-                y=df["monthly_return"] * 100,
-                name="Monthly Return (%)",
-                mode="lines+markers",
-                line=dict(color="rgba(59, 130, 246, 1)", width=2),
-            )
-        )
+        return self._returns_chart(self._chart_data(months, forecast))
 
-        fig.add_trace(
-            go.Scatter(
-                x=df["month"],
-                y=df["benchmark_return"] * 100,
-                name="Benchmark Return (%)",
-                mode="lines+markers",
-                line=dict(color="rgba(148, 163, 184, 1)", width=2, dash="dot"),
-            )
-        )
+    def _returns_chart(self, data: Columns) -> str:
+        data = downsample(data, data["monthly_return"])
 
-        fig.add_trace(
-            go.Scatter(
-                x=df["month"],
-                y=df["monthly_alpha"] * 100,
-                name="Alpha (%)",
-                mode="lines+markers",
-                line=dict(color="rgba(139, 92, 246, 1)", width=2),
-            )
-        )
+        month = data["month"]
+        traces = [
+            trace("monthly_return", month, data["monthly_return_pct"]),
+            trace("benchmark_return", month, data["benchmark_return_pct"]),
+            trace("monthly_alpha", month, data["monthly_alpha_pct"]),
+        ]
 
-        fig.update_layout(
-            title=dict(text="Investment Performance (%)", y=0.98, x=0.5, xanchor="center"),
-            hovermode="x unified",
-            template="plotly_white",
-            margin=dict(l=40, r=40, t=100, b=40),
-            legend=dict(
-                orientation="h", yanchor="bottom", y=1.05, xanchor="right", x=1
-            ),
-            yaxis=dict(title="Return (%)"),
-        )
-
-        return cast(str, fig.to_html(full_html=False, include_plotlyjs="cdn"))
+        return figure_html(traces, "returns")
 
     def get_fi_chart(self, months: Optional[int] = None, forecast: Optional[int] = None) -> str:
         """Generate line chart for Financial Independence ratios."""
-        df = self._load_csv("forecast.csv")
-        df = self._filter_data(df, months, forecast)
-
-        fig = go.Figure()
-
-        fig.add_trace(
-            go.Scatter(
-                x=df["month"],
-                y=df["fi_ratio_12m"],
-                name="FI Ratio (12m)",
-                mode="lines+markers",
-                line=dict(color="rgba(59, 130, 246, 1)", width=2),
-            )
-        )
+        return self._fi_chart(self._chart_data(months, forecast))
 
-        fig.add_trace(
-            go.Scatter(
-                x=df["month"],
-                y=df["fi_ratio_48m"],
-                name="FI Ratio (48m)",
-                mode="lines+markers",
-                line=dict(color="rgba(16, 185, 129, 1)", width=2),
-            )
-        )
+    def _fi_chart(self, data: Columns) -> str:
+        data = downsample(data, data["fi_ratio_12m"])
 
-        fig.add_trace(
-            go.Scatter(
-                x=df["month"],
-                y=df["fi_ratio_next_12m"],
-                name="FI Ratio (Proj)",
-                mode="lines+markers",
-                line=dict(color="rgba(245, 158, 11, 1)", width=2, dash="dot"),
-            )
-        )
+        month = data["month"]
+        traces = [
+            trace("fi_ratio_12m", month, data["fi_ratio_12m"]),
+            trace("fi_ratio_48m", month, data["fi_ratio_48m"]),
+            trace("fi_ratio_next_12m", month, data["fi_ratio_next_12m"]),
+        ]
 
-        fig.update_layout(
-            title=dict(text="Financial Independence Ratio (Years Covered)", y=0.98, x=0.5, xanchor="center"),
-            hovermode="x unified",
-            template="plotly_white",
-            margin=dict(l=40, r=40, t=100, b=40),
-            legend=dict(
-                orientation="h", yanchor="bottom", y=1.05, xanchor="right", x=1
-            ),
-            yaxis=dict(title="Ratio (x Expenses)"),
-            shapes=[
-                dict(
-                    type="line",
-                    yref="y",
-                    y0=1.0,
-                    y1=1.0,
-                    xref="paper",
-                    x0=0,
-                    x1=1,
-                    line=dict(
-                        color="rgba(239, 68, 68, 0.5)",
-                        width=2,
-                        dash="dashdot",
-                    ),
-                    name="FIRE Target (100%)",
-                )
-            ],
-        )
+        return figure_html(traces, "fi")
+
+    def render_all(
+        self, months: Optional[int] = None, forecast: Optional[int] = None
+    ) -> dict[str, str]:
+        """Render every chart for one range, keyed by chart name.
 
-        return cast(str, fig.to_html(full_html=False, include_plotlyjs="cdn"))
+        The range is looked up and sliced once and shared by all the charts.
+        """
+        data = self._chart_data(months, forecast)
+        return {name: getattr(self, f"_{name}_chart")(data) for name in CHART_NAMES}